@@ -1,15 +1,20 @@
 import os
 from flask import Flask
 
-from config import SECRET_KEY, logger
+from config import ORDER_INDEX_ENABLED, SECRET_KEY, logger
 from routes import register_routes
+from utils.commands import register_commands
 from utils.database import verify_db_connection
+from utils.json_provider import AppJSONProvider
+from utils.migrations import apply_migrations
+from utils.order_index import get_order_index
 
 
 def create_app():
     """Create and configure the Flask application."""
     flask_app = Flask(__name__)
     flask_app.secret_key = SECRET_KEY
+    flask_app.json = AppJSONProvider(flask_app)
 
     if not flask_app.secret_key:
         raise ValueError("FLASK_SECRET_KEY environment variable is not set")
@@ -17,11 +22,19 @@ def create_app():
     if not verify_db_connection():
         raise RuntimeError("Unable to connect to database")
 
+    schema_version = apply_migrations()
+    logger.info(f"Database schema at version {schema_version}")
+
+    if ORDER_INDEX_ENABLED:
+        get_order_index().refresh()
+        logger.info(f"Order number index warmed: {get_order_index().stats()['order_numbers']} orders")
+
     template_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
     logger.info(f"Using template folder: {template_folder}")
     logger.info(f"Flask app instance: {flask_app}")
 
     register_routes(flask_app)
+    register_commands(flask_app)
 
     logger.info("Registered routes:")
     for rule in flask_app.url_map.iter_rules():
@@ -0,0 +1,139 @@
+"""
+Time one archive page render: the previous multi-connection flow versus the
+single-snapshot OrdersDB.get_archived_orders
+
+    python -m benchmarks.archive_page --orders 200000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from benchmarks.datagen import create_database
+from models.orders import OrdersDB
+from utils.database import get_pool, get_read_connection
+from utils.order_helpers import format_order_dict
+from utils.query_builders import (
+    build_date_filter_conditions,
+    build_period_filter_conditions,
+    build_status_filter_conditions,
+    combine_filter_conditions
+)
+
+
+@contextmanager
+def count_statements():
+    """
+    Count SQL statements executed on pooled connections inside the block
+    """
+    pool = get_pool()
+    counter = {'statements': 0, 'connections': 0}
+    original_acquire = pool.acquire
+
+    def acquire():
+        conn = original_acquire()
+        counter['connections'] += 1
+        conn.set_trace_callback(lambda _: counter.__setitem__('statements', counter['statements'] + 1))
+        return conn
+
+    pool.acquire = acquire
+    try:
+        yield counter
+    finally:
+        pool.acquire = original_acquire
+        for conn in list(pool._idle.queue):
+            conn.set_trace_callback(None)
+
+
+def previous_archive_page(status_filter, year_filter, month_filter, page, limit):
+    """
+    The archive read path as it stood before it was folded into one statement
+    (the parent of the commit that did so), replayed statement for statement:
+    facets from the version cache, a COUNT and the page on one connection,
+    then the rollup totals on a second, nested connection
+    """
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        OrdersDB.get_archive_facets()
+
+        base_query = """
+            FROM orders 
+            WHERE order_status IN ('completed', 'cancelled')
+        """
+        query_conditions, query_params = combine_filter_conditions(
+            build_status_filter_conditions(status_filter),
+            build_date_filter_conditions(year_filter, month_filter)
+        )
+        cursor.execute(f"SELECT COUNT(*) as total {base_query}{query_conditions}", query_params)
+        cursor.fetchone()
+
+        cursor.execute(f"""
+            SELECT rowid AS order_rowid, * {base_query}{query_conditions}
+            ORDER BY order_date DESC, last_updated DESC, rowid DESC
+            LIMIT ? OFFSET ?
+        """, query_params + [limit + 1, (page - 1) * limit])
+        orders = []
+        for row in cursor.fetchall()[:limit]:
+            order = format_order_dict(row)
+            del order['order_rowid']
+            orders.append(order)
+
+        with get_read_connection() as totals_conn:
+            totals_conditions, totals_params = combine_filter_conditions(
+                build_status_filter_conditions(status_filter),
+                build_period_filter_conditions(year_filter, month_filter)
+            )
+            totals_conn.execute(f"""
+                SELECT currency, SUM(total) as total
+                FROM order_totals_rollup
+                WHERE order_status IN ('completed', 'cancelled'){totals_conditions}
+                GROUP BY currency ORDER BY currency
+            """, totals_params).fetchall()
+        return orders
+
+
+def current_archive_page(status_filter, year_filter, month_filter, page, limit):
+    return OrdersDB.get_archived_orders(status_filter, year_filter, month_filter, page, limit)[0]
+
+
+def measure(func, args, repeat):
+    func(*args)
+    with count_statements() as counter:
+        func(*args)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--database', default=None)
+    args = parser.parse_args()
+
+    path = args.database or os.path.join(tempfile.gettempdir(), f"parcels_bench_{args.orders}.sqlite")
+    create_database(path, args.orders)
+
+    scenarios = {
+        'first page': (None, None, None, 1, 10),
+        'year filter': (None, '2022', None, 1, 10),
+        'status+month': ('completed', '2023', '06', 3, 10),
+        'deep page': (None, None, None, 500, 10),
+    }
+    print(f"{'scenario':<14} {'previous ms':>12} {'current ms':>11} {'stmts':>8} {'conns':>7}")
+    for name, scenario in scenarios.items():
+        before, before_count = measure(previous_archive_page, scenario, args.repeat)
+        after, after_count = measure(current_archive_page, scenario, args.repeat)
+        print(f"{name:<14} {before:>12.2f} {after:>11.2f} "
+              f"{before_count['statements']:>3} -> {after_count['statements']:<2} "
+              f"{before_count['connections']:>2} -> {after_count['connections']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+from typing import Iterator, Tuple
+
+from utils.database import init_pool
+from utils.migrations import apply_migrations
+
+VENDORS = [f"Vendor {i:03d}" for i in range(250)]
+ITEMS = ["Widget", "Gadget", "Sprocket", "Gear", "Bracket", "Cable", "Panel", "Sensor"]
+COLORS = ["red", "green", "blue", "black", "white"]
+
+# (value, weight) pairs; archived orders dominate a mature database
+STATUSES = [("active", 6), ("shipped", 4), ("completed", 80), ("cancelled", 10)]
+CURRENCIES = [("USD", 60), ("EUR", 20), ("GBP", 10), ("JPY", 10)]
+SHIPPERS = [("FEDEX", 55), ("UPS", 25), ("DHL", 10), ("", 10)]
+
+INSERT_SQL = """
+             INSERT INTO orders (order_date, vendor, order_no, item_name,
+                                 quantity, currency, amount, color,
+                                 shipped_date, shipper, tracking_no, location,
+                                 delivery, last_updated, notes, order_status)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             """
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def generate_orders(count: int, seed: int = 42, years: int = 8) -> Iterator[Tuple]:
+    """
+    Yield count reproducible order rows in INSERT_SQL column order
+    """
+    rng = random.Random(seed)
+    end = date(2025, 12, 31)
+    span = years * 365
+
+    for i in range(count):
+        order_date = end - timedelta(days=rng.randrange(span))
+        status = _weighted(rng, STATUSES)
+        currency = _weighted(rng, CURRENCIES)
+        amount = rng.lognormvariate(4, 1) * (100 if currency == "JPY" else 1)
+
+        shipper = tracking_no = shipped_date = None
+        if status != "active":
+            shipped_date = order_date + timedelta(days=rng.randint(1, 10))
+            shipper = _weighted(rng, SHIPPERS) or None
+            if shipper:
+                tracking_no = f"{rng.randrange(10 ** 11, 10 ** 12)}"
+        last_updated = (shipped_date or order_date) + timedelta(days=rng.randint(0, 20))
+
+        yield (
+            order_date.isoformat(),
+            rng.choice(VENDORS),
+            f"PO-{i:08d}",
+            f"{rng.choice(ITEMS)} {rng.randint(1, 500)}",
+            rng.randint(1, 20),
+            currency,
+            f"{amount:.2f}",
+            rng.choice(COLORS),
+            shipped_date.isoformat() if shipped_date else None,
+            shipper,
+            tracking_no,
+            rng.choice(["Warehouse A", "Warehouse B", None]),
+            None,
+            last_updated.isoformat(),
+            rng.choice([None, None, "Gift wrap", "Fragile", "Backordered item"]),
+            status,
+        )
+
+
+def create_database(path: str, count: int, seed: int = 42, batch_size: int = 10000) -> str:
+    """
+    Create a migrated database at path seeded with count orders, reusing (and
+    migrating) an existing file if it already holds that many orders
+    """
+    if os.path.exists(path):
+        with sqlite3.connect(path) as conn:
+            try:
+                if conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == count:
+                    # Bring a database generated by an older checkout up to the current schema
+                    init_pool(path)
+                    apply_migrations()
+                    return path
+            except sqlite3.Error:
+                pass
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    init_pool(path)
+    apply_migrations()
+
+    conn = sqlite3.connect(path)
+    try:
+        rows = generate_orders(count, seed)
+        while True:
+            batch = [row for _, row in zip(range(batch_size), rows)]
+            if not batch:
+                break
+            conn.executemany(INSERT_SQL, batch)
+            conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    return path
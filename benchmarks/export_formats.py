@@ -0,0 +1,75 @@
+"""
+Compare archive export formats: bytes on the wire and CPU time per row for
+CSV and NDJSON, plain and gzip-compressed
+
+    python -m benchmarks.export_formats --orders 100000 --levels 1 6
+
+Each variant streams the full archive export through the route, so the CPU
+figure covers reading the rows, encoding them and compressing the chunks.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, Optional
+
+import utils.csv_helpers
+from benchmarks.datagen import create_database
+from benchmarks.suite import build_app, database_path
+from models.orders import OrdersDB
+from utils.database import init_pool
+from utils.slow_queries import get_slow_query_log
+
+
+def run_variant(client, export_format: str, compression: Optional[str], repeat: int) -> Dict:
+    url = f"/archive/export_csv?format={export_format}"
+    if compression:
+        url += f"&compression={compression}"
+
+    cpu_times, wall_times = [], []
+    size = 0
+    for _ in range(repeat):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        response = client.get(url)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        cpu_times.append(time.process_time() - cpu_started)
+        wall_times.append(time.perf_counter() - wall_started)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+    return {'bytes': size, 'cpu': statistics.median(cpu_times), 'wall': statistics.median(wall_times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100000, help='size of the seeded database')
+    parser.add_argument('--levels', type=int, nargs='+', default=[6], help='gzip compression levels to try')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    get_slow_query_log().configure(0, 0.0)
+    path = database_path(args.orders)
+    create_database(path, args.orders, args.seed)
+    init_pool(path)
+    client = build_app().test_client()
+    rows = sum(1 for _ in OrdersDB.export_archived_orders())
+    print(f"{args.orders:,} orders, {rows:,} archived rows exported")
+
+    default_level = utils.csv_helpers.EXPORT_GZIP_LEVEL
+    baseline = None
+    for export_format in ('csv', 'ndjson'):
+        variants = [(None, None)] + [('gzip', level) for level in args.levels]
+        for compression, level in variants:
+            if level is not None:
+                utils.csv_helpers.EXPORT_GZIP_LEVEL = level
+            result = run_variant(client, export_format, compression, args.repeat)
+            baseline = baseline or result['bytes']
+            label = export_format + (f" gzip -{level}" if compression else '')
+            print(f"  {label:<16} {result['bytes']:>12,} bytes  {result['bytes'] / baseline:>6.1%} of csv  "
+                  f"{result['cpu'] / rows * 1e6:>7.2f} us cpu/row  {result['wall'] * 1000:>8.1f} ms")
+    utils.csv_helpers.EXPORT_GZIP_LEVEL = default_level
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare per-row cost of eager format_order_dict dicts with lazy OrderRecord views
+
+    python -m benchmarks.order_records --rows 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.datagen import create_database
+from utils.database import get_read_connection
+from utils.order_helpers import OrderRecord, format_order_dict
+
+# Columns a listing template typically shows
+LISTING_FIELDS = ('order_date', 'vendor', 'order_no', 'item_name', 'amount_display', 'order_status')
+
+
+def build_dicts(rows):
+    return [format_order_dict(row) for row in rows]
+
+
+def build_records(rows):
+    return OrderRecord.from_rows(rows)
+
+
+def render_listing(orders):
+    for order in orders:
+        for field in LISTING_FIELDS:
+            order[field]
+
+
+def serialize(orders):
+    return json.dumps(orders, default=lambda order: order.to_dict())
+
+
+def time_per_row(func, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1e6
+
+
+def bytes_per_row(builder, rows):
+    tracemalloc.start()
+    orders = builder(rows)
+    render_listing(orders)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    create_database(os.path.join(tempfile.gettempdir(), f"parcels_bench_{args.orders}.sqlite"), args.orders)
+    with get_read_connection() as conn:
+        rows = conn.execute("SELECT * FROM orders LIMIT ?", (args.rows,)).fetchall()
+
+    print(f"{'step (per row)':<26} {'dict':>10} {'OrderRecord':>12}")
+    for name, step in [
+        ('build', lambda builder: builder),
+        ('build + render listing', lambda builder: lambda r: render_listing(builder(r))),
+        ('build + serialize', lambda builder: lambda r: serialize(builder(r))),
+    ]:
+        eager = time_per_row(step(build_dicts), rows, args.repeat)
+        lazy = time_per_row(step(build_records), rows, args.repeat)
+        print(f"{name:<26} {eager:>8.2f}us {lazy:>10.2f}us")
+
+    print(f"{'retained memory':<26} {bytes_per_row(build_dicts, rows):>9.0f}B "
+          f"{bytes_per_row(build_records, rows):>11.0f}B")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+Benchmark every OrdersDB method and the main routes on seeded databases
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --sizes 10000 --compare bench.json
+
+Databases of each size are generated once (seeded, so every run sees the same
+data) and reused from the temp directory. Write benchmarks run against a copy
+so the cached databases never drift. With --compare, each case's median is
+checked against the baseline file and the exit status is 1 if any case got
+slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import Flask
+from jinja2 import ChoiceLoader, DictLoader
+
+from benchmarks.datagen import create_database
+from models.orders import OrdersDB
+from routes import register_routes
+from utils.database import init_pool
+from utils.json_provider import AppJSONProvider
+from utils.metrics import end_request_stats, start_request_stats
+from utils.response_cache import get_response_cache
+from utils.slow_queries import get_slow_query_log
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+Case = Tuple[str, Callable[[], object]]
+
+# The frontend templates are not part of this repo; these stand-ins read the
+# same fields a listing shows so rendering cost is still represented
+_ROWS = """{% for order in orders %}<tr><td>{{ order.order_date }}</td><td>{{ order.vendor }}</td>
+<td>{{ order.order_no }}</td><td>{{ order.item_name }}</td><td>{{ order.currency }}</td>
+<td>{{ order.amount_display }}</td><td>{{ order.order_status }}</td></tr>{% endfor %}"""
+FALLBACK_TEMPLATES = {
+    'index.html': _ROWS,
+    'archive.html': _ROWS,
+    'search.html': _ROWS,
+    'components/archive_table.html': _ROWS,
+    'components/archive_totals.html': "{% for c, t in currency_totals.items() %}{{ c }} {{ t }}{% endfor %}",
+}
+
+
+def database_path(size: int) -> str:
+    return os.path.join(tempfile.gettempdir(), f"parcels_bench_{size}.sqlite")
+
+
+def build_app() -> Flask:
+    """
+    The application as create_app() wires it, minus startup checks and secrets,
+    with stand-ins for any templates the repo does not ship
+    """
+    app = Flask('benchmarks')
+    app.secret_key = 'benchmark'
+    app.json = AppJSONProvider(app)
+    app.jinja_loader = ChoiceLoader([app.jinja_loader, DictLoader(FALLBACK_TEMPLATES)])
+    register_routes(app)
+    return app
+
+
+def copy_database(source: str, target: str):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict:
+    """
+    Time func; SQL statements and rows are taken from one extra instrumented call
+    """
+    func()
+    stats = start_request_stats()
+    try:
+        func()
+    finally:
+        end_request_stats()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'min_ms': round(timings[0], 4),
+        'runs': repeat,
+        'sql_statements': stats.statements,
+        'rows_fetched': stats.rows,
+    }
+
+
+def drain(iterable) -> int:
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+
+def read_cases(size: int) -> List[Case]:
+    _, _, _, pagination, _ = OrdersDB.get_archived_orders(page=1, limit=10)
+    deep_page = max(1, pagination['total_pages'] // 2)
+    first_order = OrdersDB.get_active_orders_page(limit=1)[0][0]['order_no']
+
+    return [
+        ('get_active_orders', OrdersDB.get_active_orders),
+        ('get_active_orders_page', lambda: OrdersDB.get_active_orders_page()),
+        ('get_order', lambda: OrdersDB.get_order(first_order)),
+        ('check_order_exists', lambda: OrdersDB.check_order_exists(first_order)),
+        ('check_order_exists missing', lambda: OrdersDB.check_order_exists('NO-SUCH-ORDER')),
+        ('get_archived_orders shallow', lambda: OrdersDB.get_archived_orders(page=1, limit=10)),
+        ('get_archived_orders deep', lambda: OrdersDB.get_archived_orders(page=deep_page, limit=10)),
+        ('get_archived_orders filtered',
+         lambda: OrdersDB.get_archived_orders('completed', '2023', '06', page=2, limit=10)),
+        ('get_archived_orders month only', lambda: OrdersDB.get_archived_orders(None, None, '06')),
+        ('get_archived_orders_totals', lambda: OrdersDB.get_archived_orders_totals()),
+        ('get_archived_orders_totals filtered',
+         lambda: OrdersDB.get_archived_orders_totals('completed', '2023')),
+        ('get_archive_facets', OrdersDB.get_archive_facets),
+        ('search', lambda: OrdersDB.search('widget 12')),
+        ('export_archived_orders', lambda: drain(OrdersDB.export_archived_orders())),
+        ('export_archived_orders filtered',
+         lambda: drain(OrdersDB.export_archived_orders('completed', '2023-06'))),
+    ]
+
+
+def route_cases(size: int) -> List[Case]:
+    client = build_app().test_client()
+    first_order = OrdersDB.get_active_orders_page(limit=1)[0][0]['order_no']
+
+    cache = get_response_cache()
+    cache_bytes = cache.max_bytes
+
+    def get(url: str, headers: Optional[Dict] = None, cached: bool = False):
+        def request():
+            # Uncached cases keep measuring the full render path
+            cache.max_bytes = cache_bytes if cached else 0
+            try:
+                response = client.get(url, headers=headers)
+            finally:
+                cache.max_bytes = cache_bytes
+            response.get_data()
+            response.close()
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return request
+
+    return [
+        ('GET /', get('/')),
+        ('GET /active_orders', get('/active_orders')),
+        ('GET /check_order_no', get(f'/check_order_no/{first_order}')),
+        ('GET /check_order_no missing', get('/check_order_no/NO-SUCH-ORDER')),
+        ('GET /archive', get('/archive', AJAX)),
+        ('GET /archive deep', get('/archive?page=500', AJAX)),
+        ('GET /archive filtered', get('/archive?status=completed&year=2023&month=06', AJAX)),
+        ('GET /search', get('/search?q=widget', AJAX)),
+        ('GET /archive/export_csv filtered', get('/archive/export_csv?status=completed&year=2023&month=06')),
+        ('GET /api/v1/orders fields', get('/api/v1/orders?fields=order_no,amount,currency,order_status')),
+        ('GET /api/v1/orders filtered', get('/api/v1/orders?status=completed&year=2023&month=06')),
+        ('GET /api/v1/totals', get('/api/v1/totals?year=2023')),
+        ('GET / cached', get('/', cached=True)),
+        ('GET /archive cached', get('/archive', AJAX, cached=True)),
+        ('GET /archive filtered cached', get('/archive?status=completed&year=2023&month=06', AJAX, cached=True)),
+    ]
+
+
+def write_cases(size: int) -> List[Case]:
+    sequence = iter(range(10 ** 9))
+    template = {
+        'order_date': '2025-06-01', 'vendor': 'Bench Vendor', 'item_name': 'Bench item',
+        'quantity': '1', 'currency': 'USD', 'amount': '12.50', 'color': 'blue',
+        'shipped_date': '', 'shipper': '', 'tracking_no': '', 'location': '',
+        'delivery': '', 'notes': '', 'order_status': 'active'
+    }
+    target = OrdersDB.get_active_orders_page(limit=1)[0][0].to_dict()
+    update = {key: target[key] for key in list(template) + ['last_updated']}
+
+    def create():
+        OrdersDB.create_order(dict(template, order_no=f"BENCH-{next(sequence):09d}"))
+
+    def create_and_delete():
+        order_no = f"BENCH-DEL-{next(sequence):09d}"
+        OrdersDB.create_order(dict(template, order_no=order_no))
+        OrdersDB.delete_order(order_no)
+
+    return [
+        ('create_order', create),
+        ('update_order', lambda: OrdersDB.update_order(target['order_no'], update)),
+        ('create_order + delete_order', create_and_delete),
+    ]
+
+
+def run_size(size: int, repeat: int, export_repeat: int, seed: int) -> Dict[str, Dict]:
+    path = database_path(size)
+    started = time.perf_counter()
+    create_database(path, size, seed)
+    print(f"\n{size:,} orders ({path}, ready in {time.perf_counter() - started:.1f}s)")
+
+    results = {}
+
+    def run(cases: List[Case]):
+        for name, func in cases:
+            runs = export_repeat if 'export' in name else repeat
+            results[name] = measure(func, runs)
+            result = results[name]
+            print(f"  {name:<38} {result['median_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+                  f"{result['sql_statements']:>3} stmts {result['rows_fetched']:>8} rows")
+
+    run(read_cases(size))
+    run(route_cases(size))
+
+    write_path = f"{path}.writes"
+    copy_database(path, write_path)
+    init_pool(write_path)
+    try:
+        run(write_cases(size))
+    finally:
+        init_pool(path)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(write_path + suffix):
+                os.remove(write_path + suffix)
+
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, noise_ms: float) -> int:
+    """
+    Print per-case median changes against baseline and return the regression count
+    """
+    regressions = 0
+    print(f"\nCompared with {baseline['environment'].get('commit') or 'baseline'} "
+          f"(threshold +{threshold:.0%})")
+    for size, cases in results['sizes'].items():
+        baseline_cases = baseline['sizes'].get(size)
+        if not baseline_cases:
+            print(f"  {size}: not in baseline")
+            continue
+        for name, result in cases.items():
+            previous = baseline_cases.get(name)
+            if not previous:
+                continue
+            change = result['median_ms'] / previous['median_ms'] - 1 if previous['median_ms'] else 0.0
+            # Sub-millisecond cases jitter by more than any sensible ratio; ignore tiny absolute moves
+            regressed = change > threshold and result['median_ms'] - previous['median_ms'] > noise_ms
+            regressions += regressed
+            print(f"  {size:>8} {name:<38} {previous['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms "
+                  f"{change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--export-repeat', type=int, default=3,
+                        help='runs for full exports, which read every archived order')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON from an earlier --output run')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown of a median that counts as a regression')
+    parser.add_argument('--noise-ms', type=float, default=0.1,
+                        help='slowdowns smaller than this many milliseconds are never regressions')
+    args = parser.parse_args()
+
+    # Large sizes are slow by design; logging each call would only add noise and time
+    get_slow_query_log().configure(0, 0.0)
+
+    results = {
+        'environment': environment(),
+        'settings': {'repeat': args.repeat, 'export_repeat': args.export_repeat, 'seed': args.seed},
+        'sizes': {str(size): run_size(size, args.repeat, args.export_repeat, args.seed) for size in args.sizes},
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold, args.noise_ms):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Concurrent order-creation throughput: per-call commits versus the group-commit
+write queue
+
+    python -m benchmarks.write_throughput --orders 10000 --threads 1 4 16
+
+Every mode runs on a fresh copy of the same seeded database. "per-call normal"
+is the default pooled path (synchronous=NORMAL, which may lose the last commits
+on power failure); "per-call full" is the same path made as durable as the
+queue; "write queue" batches commits on one synchronous=FULL connection.
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict
+
+import models.orders
+from benchmarks.datagen import create_database
+from benchmarks.suite import copy_database, database_path
+from models.orders import OrdersDB
+from utils.database import init_pool
+from utils.slow_queries import get_slow_query_log
+from utils.write_queue import close_write_queue, get_write_queue
+
+TEMPLATE = {
+    'order_date': '2025-06-01', 'vendor': 'Bench Vendor', 'item_name': 'Bench item',
+    'quantity': '1', 'currency': 'USD', 'amount': '12.50', 'color': 'blue',
+    'shipped_date': '', 'shipper': '', 'tracking_no': '', 'location': '',
+    'delivery': '', 'notes': '', 'order_status': 'active'
+}
+
+MODES = {
+    'per-call normal': {'queue': False, 'synchronous': 'NORMAL'},
+    'per-call full': {'queue': False, 'synchronous': 'FULL'},
+    'write queue': {'queue': True, 'synchronous': 'NORMAL'},
+}
+
+
+def run_mode(source: str, mode: str, threads: int, per_thread: int) -> Dict:
+    settings = MODES[mode]
+    target = f"{source}.throughput"
+    copy_database(source, target)
+    init_pool(target, max_size=max(threads, 1), synchronous=settings['synchronous'])
+    models.orders.WRITE_QUEUE_ENABLED = settings['queue']
+
+    errors = {'locked': 0, 'other': 0}
+    errors_lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        barrier.wait()
+        for sequence in range(per_thread):
+            try:
+                OrdersDB.create_order(dict(TEMPLATE, order_no=f"TP-{index:03d}-{sequence:07d}"))
+            except sqlite3.OperationalError as e:
+                with errors_lock:
+                    errors['locked' if 'locked' in str(e) else 'other'] += 1
+            except Exception:
+                with errors_lock:
+                    errors['other'] += 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    batches = get_write_queue().stats()['batches'] if settings['queue'] else None
+    close_write_queue()
+    models.orders.WRITE_QUEUE_ENABLED = False
+    init_pool(source)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+
+    total = threads * per_thread
+    return {'ops_per_second': total / elapsed, 'seconds': elapsed, 'batches': batches, **errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=10000, help='size of the seeded database')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--writes', type=int, default=2000, help='orders created per run, split across threads')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    get_slow_query_log().configure(0, 0.0)
+    source = database_path(args.orders)
+    create_database(source, args.orders, args.seed)
+    print(f"{args.orders:,} orders, {args.writes} creates per run")
+
+    for threads in args.threads:
+        per_thread = max(1, args.writes // threads)
+        for mode in MODES:
+            result = run_mode(source, mode, threads, per_thread)
+            batches = f"{result['batches']:>6} batches" if result['batches'] is not None else ' ' * 14
+            print(f"  {threads:>3} threads  {mode:<16} {result['ops_per_second']:>9.0f} ops/s  "
+                  f"{batches}  locked {result['locked']}  other errors {result['other']}")
+
+
+if __name__ == '__main__':
+    main()
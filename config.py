@@ -5,7 +5,54 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-DATABASE_PATH = "identifier.sqlite"
+DATABASE_PATH = os.environ.get("DATABASE_PATH", "identifier.sqlite")
+
+# Connection pool and per-connection tuning
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", 5000))
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", 16384))
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", 64 * 1024 * 1024))
+# Prepared statements kept per connection; should exceed the number of distinct query shapes
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 256))
+# Compiled SQL kept by the query registry; least recently used shapes are evicted beyond this
+QUERY_REGISTRY_MAX_SIZE = int(os.environ.get("QUERY_REGISTRY_MAX_SIZE", 512))
+
+# Streaming exports: rows fetched per batch and bytes buffered per response chunk
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 64 * 1024))
+# zlib level for compression=gzip exports: 1 is fastest, 9 smallest
+EXPORT_GZIP_LEVEL = int(os.environ.get("EXPORT_GZIP_LEVEL", 6))
+
+# Active orders listing: rows on first paint and per "load more" request
+ACTIVE_PAGE_SIZE = int(os.environ.get("ACTIVE_PAGE_SIZE", 50))
+
+# Bulk import: rows inserted per transaction
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 500))
+
+# Group commit: route single-order writes through one writer thread that commits
+# whatever is queued in batches of up to WRITE_BATCH_SIZE; WRITE_BATCH_WAIT_MS > 0
+# additionally holds each batch open that long for more writes to arrive. Bulk
+# imports and bulk updates bypass the queue: each already commits once per batch
+# on the same writer connection, which the queue borrows per batch, so the two
+# still take turns
+WRITE_QUEUE_ENABLED = os.environ.get("WRITE_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BATCH_SIZE = int(os.environ.get("WRITE_BATCH_SIZE", 64))
+WRITE_BATCH_WAIT_MS = float(os.environ.get("WRITE_BATCH_WAIT_MS", 0))
+
+# Keep every order number in memory so existence checks for unknown numbers skip SQLite
+ORDER_INDEX_ENABLED = os.environ.get("ORDER_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+# Longest a miss may rely on the index without re-checking for other processes' commits; 0 checks on every miss
+ORDER_INDEX_REFRESH_MS = float(os.environ.get("ORDER_INDEX_REFRESH_MS", 0))
+
+# Memory bound for rendered listing responses cached until the data changes; 0 disables
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# Build display columns (amounts, tracking URLs, blank NULLs) in SQL for listings
+SQL_FORMATTING = os.environ.get("SQL_FORMATTING", "false").lower() in ("1", "true", "yes")
+
+# Per-request instrumentation and the Prometheus /metrics endpoint
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
 
 logging.basicConfig(
     level=logging.ERROR,
@@ -13,6 +60,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Slow-query log: statements over SLOW_QUERY_MS (0 disables) are logged with
+# their query plan; SLOW_QUERY_SAMPLE_RATE is the fraction of those logged
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", 1.0))
+slow_query_logger = logging.getLogger("parcels.slow_queries")
+slow_query_logger.setLevel(logging.WARNING)
+
 SECRET_KEY = os.environ.get("FLASK_SECRET_KEY")
 
 SHIPPING_CARRIERS = {
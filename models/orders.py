@@ -1,45 +1,241 @@
+import json
 import sqlite3
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-
-from config import logger
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from config import (
+    ACTIVE_PAGE_SIZE,
+    DB_POOL_TIMEOUT,
+    EXPORT_BATCH_SIZE,
+    IMPORT_BATCH_SIZE,
+    ORDER_INDEX_ENABLED,
+    SQL_FORMATTING,
+    WRITE_QUEUE_ENABLED,
+    logger
+)
+from utils.cache import VersionedCache
 from utils.data_processing import process_record_data
-from utils.database import get_db_connection
-from utils.order_helpers import format_order_dict, get_order_not_null_columns
-from utils.pagination import create_pagination_info
+from utils.data_version import bump_data_version, get_data_version
+from utils.database import get_db_connection, get_read_connection
+from utils.metrics import instrument_methods
+from utils.order_helpers import (
+    OrderRecord,
+    format_order_dict,
+    get_order_columns,
+    get_order_not_null_columns
+)
+from utils.order_index import get_order_index
+from utils.pagination import (
+    create_cursor_pagination_info,
+    create_page_pagination_info,
+    create_pagination_info,
+    cursor_from_row,
+    decode_cursor
+)
 from utils.query_builders import (
     build_date_filter_conditions,
+    build_formatted_select,
+    build_period_filter_conditions,
+    build_search_match,
+    build_seek_conditions,
     build_status_filter_conditions,
     combine_filter_conditions
 )
-
-
+from utils.query_registry import compiled_query
+from utils.write_queue import get_write_queue
+
+_facet_cache = VersionedCache()
+
+
+def _listing_columns(table_alias: str = '') -> str:
+    """
+    Select list for order listings: raw columns, or display-ready ones when
+    SQL_FORMATTING is on
+    """
+    if SQL_FORMATTING:
+        return build_formatted_select(get_order_columns(), table_alias, get_order_not_null_columns())
+    return f"{table_alias}.*" if table_alias else '*'
+
+
+def _canonical_fields(fields: List[str]) -> List[str]:
+    """
+    Reduce requested fields to known order columns in schema order
+    """
+    requested = set(fields)
+    return [column for column in get_order_columns() if column in requested]
+
+
+_INSERT_ORDER_SQL = """
+                    INSERT INTO orders (order_date, vendor, order_no, item_name,
+                                        quantity, currency, amount, color,
+                                        shipped_date, shipper, tracking_no, location,
+                                        delivery, last_updated, notes, order_status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """
+
+
+# One statement both inserts and detects a duplicate order_no (no row is written)
+_CREATE_ORDER_SQL = _INSERT_ORDER_SQL + """
+                    ON CONFLICT (order_no) DO NOTHING
+                    """
+
+# Idempotent variant: a repeated submission rewrites the existing order with the same data
+_UPSERT_ORDER_SQL = _INSERT_ORDER_SQL + """
+                    ON CONFLICT (order_no) DO UPDATE
+                    SET order_date   = excluded.order_date,
+                        vendor       = excluded.vendor,
+                        item_name    = excluded.item_name,
+                        quantity     = excluded.quantity,
+                        currency     = excluded.currency,
+                        amount       = excluded.amount,
+                        color        = excluded.color,
+                        shipped_date = excluded.shipped_date,
+                        shipper      = excluded.shipper,
+                        tracking_no  = excluded.tracking_no,
+                        location     = excluded.location,
+                        delivery     = excluded.delivery,
+                        last_updated = excluded.last_updated,
+                        notes        = excluded.notes,
+                        order_status = excluded.order_status
+                    """
+
+
+class DuplicateOrderError(Exception):
+    """
+    Raised when creating an order whose order_no is already taken
+    """
+
+
+def _order_insert_params(processed_data: Dict, current_datetime: str) -> Tuple:
+    """
+    Bind processed order data to the _INSERT_ORDER_SQL placeholders
+    """
+    return (
+        processed_data['order_date'],
+        processed_data['vendor'],
+        processed_data['order_no'],
+        processed_data['item_name'],
+        processed_data.get('quantity'),
+        processed_data['currency'],
+        processed_data['amount'],
+        processed_data['color'],
+        processed_data.get('shipped_date'),
+        processed_data.get('shipper'),
+        processed_data.get('tracking_no'),
+        processed_data.get('location'),
+        processed_data.get('delivery'),
+        current_datetime,
+        processed_data.get('notes'),
+        processed_data['order_status']
+    )
+
+
+_UPDATE_ORDER_SQL = """
+                    UPDATE orders
+                    SET order_date   = COALESCE(NULLIF(?, ''), order_date),
+                        vendor       = COALESCE(NULLIF(?, ''), vendor),
+                        item_name    = COALESCE(NULLIF(?, ''), item_name),
+                        quantity     = ?,
+                        currency     = COALESCE(NULLIF(?, ''), currency),
+                        amount       = COALESCE(NULLIF(?, ''), amount),
+                        color        = COALESCE(NULLIF(?, ''), color),
+                        shipped_date = ?,
+                        shipper      = ?,
+                        tracking_no  = ?,
+                        location     = ?,
+                        delivery     = ?,
+                        last_updated = COALESCE(NULLIF(?, ''), last_updated),
+                        notes        = ?,
+                        order_status = COALESCE(NULLIF(?, ''), order_status)
+                    WHERE order_no = ?
+                    """
+
+
+def _order_update_params(processed_data: Dict, order_no: str) -> Tuple:
+    """
+    Bind processed order data to the _UPDATE_ORDER_SQL placeholders
+    """
+    return (
+        processed_data["order_date"],
+        processed_data["vendor"],
+        processed_data["item_name"],
+        processed_data.get("quantity"),
+        processed_data["currency"],
+        processed_data["amount"],
+        processed_data["color"],
+        processed_data.get("shipped_date"),
+        processed_data.get("shipper"),
+        processed_data.get("tracking_no"),
+        processed_data.get("location"),
+        processed_data.get("delivery"),
+        processed_data["last_updated"],
+        processed_data.get("notes"),
+        processed_data["order_status"],
+        order_no
+    )
+
+
+@instrument_methods
 class OrdersDB:
     @staticmethod
-    def get_active_orders() -> List[Dict]:
+    def get_active_orders() -> List[OrderRecord]:
         """
         Retrieve all active orders (including those with empty status)
         """
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             try:
                 cursor = conn.cursor()
-                cursor.execute("""
-                               SELECT *
+                cursor.execute(compiled_query('active_orders', SQL_FORMATTING, lambda: f"""
+                               SELECT {_listing_columns()}
                                FROM orders
                                WHERE order_status NOT IN ('completed', 'cancelled')
                                ORDER BY order_date DESC, last_updated DESC
-                               """)
-                return [format_order_dict(row) for row in cursor.fetchall()]
+                               """))
+                return OrderRecord.from_rows(cursor.fetchall())
             except Exception as e:
                 logger.error(f"Error getting active orders: {str(e)}")
                 raise
 
+    @staticmethod
+    def get_active_orders_page(
+            limit: int = ACTIVE_PAGE_SIZE,
+            after: Optional[str] = None
+    ) -> Tuple[List[OrderRecord], Dict]:
+        """
+        Retrieve one page of active orders, newest first
+
+        Seeks past the `after` cursor on the partial active-orders index, so
+        each page costs the same however large the active backlog grows.
+        """
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                seek_conditions, seek_params = build_seek_conditions(decode_cursor(after))
+                page_query = compiled_query('active_page', (SQL_FORMATTING, seek_conditions), lambda: f"""
+                               SELECT rowid AS order_rowid, {_listing_columns()}
+                               FROM orders
+                               WHERE order_status NOT IN ('completed', 'cancelled'){seek_conditions}
+                               ORDER BY order_date DESC, last_updated DESC, rowid DESC
+                               LIMIT ?
+                               """)
+                cursor.execute(page_query, seek_params + [limit + 1])
+                rows = cursor.fetchall()
+
+                next_cursor = cursor_from_row(rows[limit - 1]) if len(rows) > limit else None
+                orders = OrderRecord.from_rows(rows[:limit], exclude=('order_rowid',))
+
+                return orders, create_cursor_pagination_info(limit, next_cursor)
+            except Exception as e:
+                logger.error(f"Error getting active orders page: {str(e)}")
+                raise
+
     @staticmethod
     def get_order(order_no: str) -> Optional[Dict]:
         """
         Retrieve a specific order regardless of status
         """
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             try:
                 cursor = conn.cursor()
                 cursor.execute("""
@@ -53,6 +249,80 @@ class OrdersDB:
                 logger.error(f"Error getting order {order_no}: {str(e)}")
                 raise
 
+    @staticmethod
+    def get_order_fields(order_no: str, fields: List[str]) -> Optional[Dict]:
+        """
+        Retrieve only the given columns of a specific order, unformatted
+
+        fields are reduced to known columns in schema order, so each field set
+        compiles to one query however the client lists it.
+        """
+        fields = _canonical_fields(fields)
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                order_query = compiled_query('order_fields', tuple(fields), lambda: f"""
+                               SELECT {', '.join(fields)}
+                               FROM orders
+                               WHERE order_no = ?
+                               """)
+                cursor.execute(order_query, (order_no,))
+                order = cursor.fetchone()
+                return dict(zip(fields, order)) if order else None
+            except Exception as e:
+                logger.error(f"Error getting order {order_no}: {str(e)}")
+                raise
+
+    @staticmethod
+    def get_orders_fields_page(
+            fields: List[str],
+            status_filter: Optional[str] = None,
+            year_filter: Optional[str] = None,
+            month_filter: Optional[str] = None,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        Retrieve one page of orders of any status, newest first, with only
+        the given columns, unformatted
+
+        fields are reduced to known columns in schema order, so each field set
+        compiles to one query however the client lists it. The sort key
+        columns are selected alongside them for the cursor, but left out of
+        the returned orders.
+        """
+        fields = _canonical_fields(fields)
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
+
+                status_conditions = build_status_filter_conditions(status_filter)
+                date_conditions = build_date_filter_conditions(year_filter, month_filter)
+                seek_conditions, seek_params = build_seek_conditions(decode_cursor(after))
+                query_conditions, query_params = combine_filter_conditions(
+                    status_conditions, date_conditions, (seek_conditions, seek_params)
+                )
+
+                # Requested columns come first so each row zips straight onto fields
+                columns = fields + [column for column in ('order_date', 'last_updated') if column not in fields]
+                page_query = compiled_query('fields_page', (tuple(fields), query_conditions), lambda: f"""
+                               SELECT {', '.join(columns)}, rowid AS order_rowid
+                               FROM orders
+                               WHERE 1 = 1{query_conditions}
+                               ORDER BY order_date DESC, last_updated DESC, rowid DESC
+                               LIMIT ?
+                               """)
+                cursor.execute(page_query, query_params + [limit + 1])
+                rows = cursor.fetchall()
+
+                next_cursor = cursor_from_row(rows[limit - 1]) if len(rows) > limit else None
+                orders = [dict(zip(fields, row)) for row in rows[:limit]]
+
+                return orders, create_cursor_pagination_info(limit, next_cursor)
+            except Exception as e:
+                logger.error(f"Error getting orders fields page: {str(e)}")
+                raise
+
     @staticmethod
     def check_order_exists(
             order_no: str,
@@ -60,8 +330,16 @@ class OrdersDB:
     ) -> bool:
         """
         Check if an order number already exists
+
+        Numbers missing from the in-memory order number index are answered
+        without a query; only possible matches are confirmed in SQLite.
         """
-        with get_db_connection() as conn:
+        if current_order and order_no == current_order:
+            return False
+        if ORDER_INDEX_ENABLED and not get_order_index().might_contain(order_no):
+            return False
+
+        with get_read_connection() as conn:
             try:
                 cursor = conn.cursor()
                 if current_order:
@@ -83,113 +361,275 @@ class OrdersDB:
                 raise
 
     @staticmethod
-    def create_order(order_data: Dict) -> None:
+    def create_order(order_data: Dict, upsert: bool = False) -> None:
         """
         Create a new order
+
+        Relies on the UNIQUE order_no index, so a single statement inserts the
+        order or detects that the number is taken, with no separate existence
+        check to race against. With upsert, an existing order with the same
+        number is overwritten instead, making repeated submissions idempotent.
+
+        Raises:
+            DuplicateOrderError: If the order number exists and upsert is off
         """
-        with get_db_connection() as conn:
-            try:
-                current_datetime = datetime.now().strftime("%Y-%m-%d")
-                cursor = conn.cursor()
+        current_datetime = datetime.now().strftime("%Y-%m-%d")
+        processed_data = process_record_data(order_data, get_order_not_null_columns())
+        params = _order_insert_params(processed_data, current_datetime)
+        sql = _UPSERT_ORDER_SQL if upsert else _CREATE_ORDER_SQL
+
+        inserted = OrdersDB._write(
+            lambda cursor: cursor.execute(sql, params).rowcount,
+            "Error creating order"
+        )
+        if not inserted:
+            raise DuplicateOrderError(f"Order {processed_data['order_no']} already exists")
 
-                processed_data = process_record_data(order_data, get_order_not_null_columns())
+    @staticmethod
+    def find_existing_order_nos(order_nos: List[str]) -> Set[str]:
+        """
+        Return which of the given order numbers already exist, in one query
+
+        Numbers the in-memory order number index rules out never reach SQLite.
+        """
+        if ORDER_INDEX_ENABLED:
+            order_nos = get_order_index().candidates(order_nos)
+        if not order_nos:
+            return set()
 
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
                 cursor.execute("""
-                               INSERT INTO orders (order_date, vendor, order_no, item_name,
-                                                   quantity, currency, amount, color,
-                                                   shipped_date, shipper, tracking_no, location,
-                                                   delivery, last_updated, notes, order_status)
-                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                               """, (
-                                   processed_data['order_date'],
-                                   processed_data['vendor'],
-                                   processed_data['order_no'],
-                                   processed_data['item_name'],
-                                   processed_data.get('quantity'),
-                                   processed_data['currency'],
-                                   processed_data['amount'],
-                                   processed_data['color'],
-                                   processed_data.get('shipped_date'),
-                                   processed_data.get('shipper'),
-                                   processed_data.get('tracking_no'),
-                                   processed_data.get('location'),
-                                   processed_data.get('delivery'),
-                                   current_datetime,
-                                   processed_data.get('notes'),
-                                   processed_data['order_status']
-                               ))
-                conn.commit()
+                               SELECT order_no
+                               FROM orders
+                               WHERE order_no IN (SELECT value FROM json_each(?))
+                               """, (json.dumps(order_nos),))
+                return {row['order_no'] for row in cursor.fetchall()}
             except Exception as e:
-                conn.rollback()
-                logger.error(f"Error creating order: {str(e)}")
+                logger.error(f"Error checking existing order numbers: {str(e)}")
                 raise
 
+    @staticmethod
+    def bulk_create_orders(orders: List[Dict], batch_size: int = IMPORT_BATCH_SIZE) -> Dict[int, str]:
+        """
+        Create many orders with executemany, committing once per batch
+
+        Orders whose number is already taken, e.g. by an order created since
+        the caller checked, are skipped by ON CONFLICT DO NOTHING and reported
+        individually; the rest of their batch is still created. A batch that
+        fails otherwise is rolled back as a whole and the remaining batches
+        still run.
+
+        Returns:
+            Error messages keyed by the index of each order that was not created
+        """
+        failures = {}
+        current_datetime = datetime.now().strftime("%Y-%m-%d")
+        not_null_columns = get_order_not_null_columns()
+
+        with get_db_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                for start in range(0, len(orders), batch_size):
+                    batch = orders[start:start + batch_size]
+                    try:
+                        params = [
+                            _order_insert_params(process_record_data(order, not_null_columns), current_datetime)
+                            for order in batch
+                        ]
+                        # Holding the write lock, every row inserted below gets a rowid above this
+                        cursor.execute("BEGIN IMMEDIATE")
+                        high_water = cursor.execute("SELECT MAX(rowid) FROM orders").fetchone()[0] or 0
+                        cursor.executemany(_CREATE_ORDER_SQL, params)
+                        if cursor.rowcount < len(batch):
+                            failures.update(OrdersDB._find_skipped_orders(cursor, params, high_water, start))
+                        conn.commit()
+                    except sqlite3.Error as e:
+                        conn.rollback()
+                        logger.error(f"Error importing orders {start + 1}-{start + len(batch)}: {str(e)}")
+                        failures.update({index: str(e) for index in range(start, start + len(batch))})
+
+                return failures
+            finally:
+                bump_data_version()
+
     @staticmethod
     def update_order(order_no: str, order_data: Dict) -> None:
         """
         Update an existing order
         """
+        processed_data = process_record_data(order_data, get_order_not_null_columns())
+        params = _order_update_params(processed_data, order_no)
+
+        OrdersDB._write(
+            lambda cursor: cursor.execute(_UPDATE_ORDER_SQL, params),
+            f"Error updating order {order_no}"
+        )
+
+    @staticmethod
+    def _find_skipped_orders(cursor: sqlite3.Cursor, params: List[Tuple],
+                             high_water: int, start: int) -> Dict[int, str]:
+        """
+        Report the orders of a batch that ON CONFLICT DO NOTHING skipped
+
+        Rows above high_water are the ones the batch inserted; a number that
+        is not among them (or was already claimed by an earlier row of the
+        batch) belonged to an existing order.
+        """
+        cursor.execute("SELECT order_no FROM orders WHERE rowid > ?", (high_water,))
+        inserted = {row['order_no'] for row in cursor.fetchall()}
+        skipped = {}
+        for position, order_params in enumerate(params):
+            # order_no is the third _INSERT_ORDER_SQL parameter
+            order_no = order_params[2]
+            if order_no in inserted:
+                inserted.discard(order_no)
+            else:
+                skipped[start + position] = "An order with this number already exists"
+        return skipped
+
+    @staticmethod
+    def bulk_update_orders(order_nos: List[str], changes: Dict) -> int:
+        """
+        Apply the same field changes to many orders in a single UPDATE
+
+        Blank values clear optional fields; a blank order_status is ignored.
+
+        Returns:
+            Number of orders updated
+        """
+        if not order_nos or not changes:
+            return 0
+
         with get_db_connection() as conn:
             try:
                 cursor = conn.cursor()
-                processed_data = process_record_data(order_data, get_order_not_null_columns())
+                processed_data = process_record_data(changes, get_order_not_null_columns())
 
-                cursor.execute("""
+                # Sort the columns so each combination of fields maps to one statement text
+                assignments = []
+                params = []
+                for column in sorted(processed_data):
+                    if column == 'order_status':
+                        assignments.append("order_status = COALESCE(NULLIF(?, ''), order_status)")
+                    else:
+                        assignments.append(f"{column} = ?")
+                    params.append(processed_data[column])
+
+                assignments.append("last_updated = ?")
+                params.append(datetime.now().strftime("%Y-%m-%d"))
+
+                cursor.execute(f"""
                                UPDATE orders
-                               SET order_date   = COALESCE(NULLIF(?, ''), order_date),
-                                   vendor       = COALESCE(NULLIF(?, ''), vendor),
-                                   item_name    = COALESCE(NULLIF(?, ''), item_name),
-                                   quantity     = ?,
-                                   currency     = COALESCE(NULLIF(?, ''), currency),
-                                   amount       = COALESCE(NULLIF(?, ''), amount),
-                                   color        = COALESCE(NULLIF(?, ''), color),
-                                   shipped_date = ?,
-                                   shipper      = ?,
-                                   tracking_no  = ?,
-                                   location     = ?,
-                                   delivery     = ?,
-                                   last_updated = COALESCE(NULLIF(?, ''), last_updated),
-                                   notes        = ?,
-                                   order_status = COALESCE(NULLIF(?, ''), order_status)
-                               WHERE order_no = ?
-                               """, (
-                                   processed_data["order_date"],
-                                   processed_data["vendor"],
-                                   processed_data["item_name"],
-                                   processed_data.get("quantity"),
-                                   processed_data["currency"],
-                                   processed_data["amount"],
-                                   processed_data["color"],
-                                   processed_data.get("shipped_date"),
-                                   processed_data.get("shipper"),
-                                   processed_data.get("tracking_no"),
-                                   processed_data.get("location"),
-                                   processed_data.get("delivery"),
-                                   processed_data["last_updated"],
-                                   processed_data.get("notes"),
-                                   processed_data["order_status"],
-                                   order_no
-                               ))
+                               SET {', '.join(assignments)}
+                               WHERE order_no IN (SELECT value FROM json_each(?))
+                               """, params + [json.dumps(order_nos)])
+                updated = cursor.rowcount
                 conn.commit()
+                return updated
             except Exception as e:
                 conn.rollback()
-                logger.error(f"Error updating order {order_no}: {str(e)}")
+                logger.error(f"Error bulk updating {len(order_nos)} orders: {str(e)}")
                 raise
+            finally:
+                bump_data_version()
 
     @staticmethod
     def delete_order(order_no: str) -> None:
         """
         Delete an order
         """
+        OrdersDB._write(
+            lambda cursor: cursor.execute("DELETE FROM orders WHERE order_no = ?", (order_no,)),
+            f"Error deleting order {order_no}"
+        )
+
+    @staticmethod
+    def _write(operation: Callable[[sqlite3.Cursor], object], error_message: str):
+        """
+        Run a single-order write and commit it
+
+        With WRITE_QUEUE_ENABLED the operation is handed to the group-commit
+        writer thread and this call returns once its batch is durable, waiting
+        at most DB_POOL_TIMEOUT; otherwise it runs and commits on the writer
+        connection.
+        """
+        if WRITE_QUEUE_ENABLED:
+            future = get_write_queue().submit(operation)
+            try:
+                return future.result(timeout=DB_POOL_TIMEOUT)
+            except FuturesTimeoutError:
+                # Still queued: cancelling guarantees it never runs. Already
+                # running: its batch may yet commit.
+                state = "was cancelled" if future.cancel() else "may still commit"
+                logger.error(f"{error_message}: timed out waiting for the write queue; the write {state}")
+                raise sqlite3.OperationalError(f"Timed out waiting for the write queue; the write {state}")
+            except Exception as e:
+                logger.error(f"{error_message}: {str(e)}")
+                raise
+
         with get_db_connection() as conn:
             try:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM orders WHERE order_no = ?", (order_no,))
+                result = operation(conn.cursor())
                 conn.commit()
+                return result
             except Exception as e:
                 conn.rollback()
-                logger.error(f"Error deleting order {order_no}: {str(e)}")
+                logger.error(f"{error_message}: {str(e)}")
                 raise
+            finally:
+                bump_data_version()
+
+    @staticmethod
+    def _build_archived_totals_query(
+            status_filter: Optional[str] = None,
+            year_filter: Optional[str] = None,
+            month_filter: Optional[str] = None,
+            archived_only: bool = True
+    ) -> Tuple[str, List]:
+        """
+        Build the currency totals query against the rollup table
+
+        Totals cover archived orders only unless archived_only is False.
+        """
+        # Build filter conditions
+        status_conditions = build_status_filter_conditions(status_filter)
+        period_conditions = build_period_filter_conditions(year_filter, month_filter)
+        query_conditions, query_params = combine_filter_conditions(
+            status_conditions, period_conditions
+        )
+
+        if not archived_only:
+            totals_query = compiled_query('totals', query_conditions, lambda: f"""
+                         SELECT currency, SUM(total) as total
+                         FROM order_totals_rollup
+                         WHERE 1 = 1{query_conditions}
+                         GROUP BY currency
+                         ORDER BY currency
+                         """)
+            return totals_query, query_params
+
+        totals_query = compiled_query('archive_totals', query_conditions, lambda: f"""
+                     SELECT currency, SUM(total) as total
+                     FROM order_totals_rollup
+                     WHERE order_status IN ('completed', 'cancelled'){query_conditions}
+                     GROUP BY currency
+                     ORDER BY currency
+                     """)
+        return totals_query, query_params
+
+    @staticmethod
+    def _format_totals(results) -> Dict[str, float]:
+        """
+        Convert (currency, total) pairs to a dictionary with proper formatting
+        """
+        totals = {}
+        for currency, total in results:
+            if currency and total is not None:
+                totals[currency] = float(f"{total:.2f}")
+
+        return totals
 
     @staticmethod
     def get_archived_orders_totals(
@@ -199,46 +639,128 @@ class OrdersDB:
     ) -> Dict[str, float]:
         """
         Get currency totals for archived orders with filters applied
+
+        Reads the trigger-maintained order_totals_rollup table, which holds one
+        row per (year, month, status, currency), instead of scanning orders.
         """
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             try:
                 cursor = conn.cursor()
+                totals_query, totals_params = OrdersDB._build_archived_totals_query(
+                    status_filter, year_filter, month_filter
+                )
+                cursor.execute(totals_query, totals_params)
+                return OrdersDB._format_totals(
+                    (row['currency'], row['total']) for row in cursor.fetchall()
+                )
 
-                base_query = """
-                             SELECT currency, SUM(CAST(amount as REAL)) as total
-                             FROM orders
-                             WHERE order_status IN ('completed', 'cancelled')
-                               AND amount IS NOT NULL
-                               AND amount != ''
-                               AND currency IS NOT NULL
-                               AND currency != '' \
-                             """
+            except Exception as e:
+                logger.error(f"Error getting archived orders totals: {str(e)}", exc_info=True)
+                return {}
 
-                # Build filter conditions
-                status_conditions = build_status_filter_conditions(status_filter)
-                date_conditions = build_date_filter_conditions(year_filter, month_filter)
-                query_conditions, query_params = combine_filter_conditions(
-                    status_conditions, date_conditions
+    @staticmethod
+    def get_orders_totals(
+            status_filter: Optional[str] = None,
+            year_filter: Optional[str] = None,
+            month_filter: Optional[str] = None
+    ) -> Dict[str, float]:
+        """
+        Get currency totals for orders of any status with filters applied
+        """
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                totals_query, totals_params = OrdersDB._build_archived_totals_query(
+                    status_filter, year_filter, month_filter, archived_only=False
                 )
+                cursor.execute(totals_query, totals_params)
+                return OrdersDB._format_totals(
+                    (row['currency'], row['total']) for row in cursor.fetchall()
+                )
+            except Exception as e:
+                logger.error(f"Error getting orders totals: {str(e)}")
+                raise
 
-                full_query = base_query + query_conditions + " GROUP BY currency ORDER BY currency"
+    @staticmethod
+    def get_archive_facets(cursor: Optional[sqlite3.Cursor] = None, version: Optional[str] = None) -> Dict:
+        """
+        Get archive filter facets: available years and order counts per month
 
-                cursor.execute(full_query, query_params)
-                results = cursor.fetchall()
+        Cached per data version and shared by all request threads, so unchanged
+        data costs no query. On a miss the facets are computed on cursor if one
+        is given, otherwise on a pooled connection. A caller reading inside its
+        own transaction passes the data version it took before starting it. The
+        returned dict must not be modified.
+        """
+        if cursor is None:
+            compute = OrdersDB._load_archive_facets
+        else:
+            def compute():
+                return OrdersDB._query_archive_facets(cursor)
 
-                # Convert to dictionary with proper formatting
-                totals = {}
-                for row in results:
-                    currency = row['currency']
-                    total = row['total']
-                    if currency and total is not None:
-                        totals[currency] = float(f"{total:.2f}")
+        if version is None:
+            version = get_data_version()
+        return _facet_cache.get_or_compute('archive_facets', version, compute)
 
-                return totals
+    @staticmethod
+    def get_facet_cache_stats() -> Dict[str, int]:
+        """
+        Return hit/miss counters for the archive facet cache
+        """
+        return _facet_cache.stats()
 
+    @staticmethod
+    def get_last_updated() -> Optional[str]:
+        """
+        Return the most recent last_updated date across all orders
+        """
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT MAX(last_updated) AS last_updated FROM orders")
+                return cursor.fetchone()['last_updated']
             except Exception as e:
-                logger.error(f"Error getting archived orders totals: {str(e)}", exc_info=True)
-                return {}
+                logger.error(f"Error getting last updated date: {str(e)}")
+                raise
+
+    @staticmethod
+    def _load_archive_facets() -> Dict:
+        """
+        Compute archive filter facets on a pooled connection
+        """
+        with get_read_connection() as conn:
+            try:
+                return OrdersDB._query_archive_facets(conn.cursor())
+            except Exception as e:
+                logger.error(f"Error getting archive facets: {str(e)}", exc_info=True)
+                raise
+
+    @staticmethod
+    def _query_archive_facets(cursor: sqlite3.Cursor) -> Dict:
+        """
+        Compute archive filter facets from the orders table
+        """
+        cursor.execute("""
+                       SELECT strftime('%Y', order_date) as year,
+                              strftime('%m', order_date) as month,
+                              COUNT(*)                   as order_count
+                       FROM orders
+                       WHERE order_status IN ('completed', 'cancelled')
+                       GROUP BY year, month
+                       ORDER BY year DESC, month DESC
+                       """)
+
+        years = []
+        month_counts = {}
+        for row in cursor.fetchall():
+            if row['year'] is None:
+                continue
+            if row['year'] not in month_counts:
+                years.append(row['year'])
+                month_counts[row['year']] = {}
+            month_counts[row['year']][row['month']] = row['order_count']
+
+        return {'years': years, 'month_counts': month_counts}
 
     @staticmethod
     def get_archived_orders(
@@ -246,26 +768,119 @@ class OrdersDB:
             year_filter: Optional[str] = None,
             month_filter: Optional[str] = None,
             page: int = 1,
-            limit: int = 10
-    ) -> Tuple[List[Dict], List[str], List[Tuple[str, str]], Dict, Dict[str, float]]:
+            limit: int = 10,
+            after: Optional[str] = None,
+            before: Optional[str] = None
+    ) -> Tuple[List[OrderRecord], List[str], List[Tuple[str, str]], Dict, Dict[str, float]]:
         """
         Get archived orders with optional filters and pagination
+
+        Pages by OFFSET unless an `after` or `before` cursor is given, in which
+        case the query seeks straight to the cursor's (order_date, last_updated, rowid),
+        the pagination carries no page numbers, and whether a page exists on the
+        far side of the cursor is checked with a one-row probe.
+        The total count and currency totals ride along with the page as
+        uncorrelated subqueries, which SQLite evaluates once per statement.
+        The page and, on a facet cache miss, the facets are read in one read
+        transaction, so they all come from one snapshot.
         """
-        with get_db_connection() as conn:
+        # Taken before the snapshot, so facets cached below are never newer than their version
+        version = get_data_version()
+        with get_read_connection() as conn:
             try:
                 cursor = conn.cursor()
+                cursor.execute("BEGIN")
 
-                # Get available filter options
-                cursor.execute("""
-                               SELECT DISTINCT strftime('%Y', order_date) as year,
-                                               strftime('%m', order_date) as month
-                               FROM orders
-                               WHERE order_status IN ('completed', 'cancelled')
-                               ORDER BY year DESC, month DESC
-                               """)
-                dates = cursor.fetchall()
+                # Build filter conditions
+                status_conditions = build_status_filter_conditions(status_filter)
+                date_conditions = build_date_filter_conditions(year_filter, month_filter)
+                query_conditions, query_params = combine_filter_conditions(
+                    status_conditions, date_conditions
+                )
+
+                totals_query, totals_params = OrdersDB._build_archived_totals_query(
+                    status_filter, year_filter, month_filter
+                )
+                summary_shape = (query_conditions, totals_query)
+                summary_columns = compiled_query('archive_summary', summary_shape, lambda: f"""
+                    (SELECT COUNT(*)
+                     FROM orders
+                     WHERE order_status IN ('completed', 'cancelled'){query_conditions}) AS total_count,
+                    (SELECT json_group_array(json_array(currency, total))
+                     FROM ({totals_query})) AS currency_totals
+                """)
+                summary_params = query_params + totals_params
+
+                # Get paginated data, fetching one extra row to detect a following page
+                after_cursor = decode_cursor(after)
+                before_cursor = None if after_cursor else decode_cursor(before)
+                seek_cursor = after_cursor or before_cursor
+                backwards = before_cursor is not None
+                seek_conditions, seek_params = build_seek_conditions(seek_cursor, backwards)
+                direction = 'ASC' if backwards else 'DESC'
+                use_offset = seek_cursor is None
+
+                data_shape = (SQL_FORMATTING, summary_shape, seek_conditions, use_offset)
+                data_query = compiled_query('archive_page', data_shape, lambda: f"""
+                    SELECT rowid AS order_rowid, {_listing_columns()}, {summary_columns}
+                    FROM orders
+                    WHERE order_status IN ('completed', 'cancelled'){query_conditions}{seek_conditions}
+                    ORDER BY order_date {direction}, last_updated {direction}, rowid {direction}
+                    LIMIT ?{' OFFSET ?' if use_offset else ''}
+                """)
+                data_params = summary_params + query_params + seek_params + [limit + 1]
+                if use_offset:
+                    data_params.append((page - 1) * limit)
+
+                cursor.execute(data_query, data_params)
+                rows = cursor.fetchall()
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+                if backwards:
+                    rows.reverse()
+
+                # An empty page carries no summary columns; only then run them alone
+                if rows:
+                    summary = rows[0]
+                else:
+                    summary_query = compiled_query(
+                        'archive_summary_only', summary_shape, lambda: f"SELECT {summary_columns}"
+                    )
+                    cursor.execute(summary_query, summary_params)
+                    summary = cursor.fetchone()
+                total_count = summary['total_count']
+                currency_totals = OrdersDB._format_totals(json.loads(summary['currency_totals']))
+
+                next_cursor = prev_cursor = None
+                if rows and seek_cursor is not None:
+                    # The extra row answers for the side the query read towards;
+                    # the other side is probed, as the cursor row may be gone
+                    if backwards:
+                        has_prev = has_more
+                        has_next = OrdersDB._archive_row_beyond(cursor, query_conditions, query_params, rows[-1])
+                    else:
+                        has_prev = OrdersDB._archive_row_beyond(cursor, query_conditions, query_params, rows[0],
+                                                                backwards=True)
+                        has_next = has_more
+                    next_cursor = cursor_from_row(rows[-1]) if has_next else None
+                    prev_cursor = cursor_from_row(rows[0]) if has_prev else None
+                elif rows:
+                    next_cursor = cursor_from_row(rows[-1]) if has_more else None
+                    prev_cursor = cursor_from_row(rows[0]) if page > 1 else None
+
+                orders = OrderRecord.from_rows(
+                    rows, exclude=('order_rowid', 'total_count', 'currency_totals')
+                )
 
-                available_years = sorted(set(row['year'] for row in dates), reverse=True) if dates else []
+                pagination = create_pagination_info(
+                    page, total_count, limit,
+                    next_cursor=next_cursor,
+                    prev_cursor=prev_cursor,
+                    cursor_mode=seek_cursor is not None
+                )
+
+                # Get available filter options
+                available_years = OrdersDB.get_archive_facets(cursor, version)['years']
                 available_months = [
                     ('01', 'January'), ('02', 'February'), ('03', 'March'),
                     ('04', 'April'), ('05', 'May'), ('06', 'June'),
@@ -273,87 +888,128 @@ class OrdersDB:
                     ('10', 'October'), ('11', 'November'), ('12', 'December')
                 ]
 
-                base_query = """
-                    FROM orders 
-                    WHERE order_status IN ('completed', 'cancelled')
-                """
+                return orders, available_years, available_months, pagination, currency_totals
 
-                # Build filter conditions
-                status_conditions = build_status_filter_conditions(status_filter)
-                date_conditions = build_date_filter_conditions(year_filter, month_filter)
+            except Exception as e:
+                logger.error(f"Error getting archived orders: {str(e)}", exc_info=True)
+                raise
+
+    @staticmethod
+    def _archive_row_beyond(cursor: sqlite3.Cursor, query_conditions: str, query_params: List,
+                            row: sqlite3.Row, backwards: bool = False) -> bool:
+        """
+        Return whether a filtered archived order sorts after row, or before it
+        when backwards
+        """
+        seek_conditions, seek_params = build_seek_conditions(
+            (row['order_date'], row['last_updated'], row['order_rowid']), backwards
+        )
+        probe_query = compiled_query('archive_probe', (query_conditions, seek_conditions), lambda: f"""
+            SELECT EXISTS (SELECT 1
+                           FROM orders
+                           WHERE order_status IN ('completed', 'cancelled'){query_conditions}{seek_conditions})
+        """)
+        cursor.execute(probe_query, query_params + seek_params)
+        return bool(cursor.fetchone()[0])
+
+    @staticmethod
+    def search(
+            search_query: str,
+            status_filter: Optional[str] = None,
+            year_filter: Optional[str] = None,
+            month_filter: Optional[str] = None,
+            page: int = 1,
+            limit: int = 20
+    ) -> Tuple[List[OrderRecord], Dict]:
+        """
+        Full-text search over order number, vendor, item name, notes and
+        tracking number, best matches first
+
+        Every word is prefix-matched. Results can be narrowed with the same
+        status/year/month filters as the archive.
+        """
+        match_expression = build_search_match(search_query)
+        if match_expression is None:
+            return [], create_page_pagination_info(page, limit, False)
+
+        with get_read_connection() as conn:
+            try:
+                cursor = conn.cursor()
+
+                status_conditions = build_status_filter_conditions(status_filter, 'o.order_status')
+                date_conditions = build_date_filter_conditions(year_filter, month_filter, 'o.order_date')
                 query_conditions, query_params = combine_filter_conditions(
                     status_conditions, date_conditions
                 )
 
-                # Get total count
-                count_query = f"SELECT COUNT(*) as total {base_query}{query_conditions}"
-                cursor.execute(count_query, query_params)
-                total_count = cursor.fetchone()['total']
-
-                # Get paginated data
-                offset = (page - 1) * limit
-                data_query = f"""
-                    SELECT * {base_query}{query_conditions}
-                    ORDER BY order_date DESC, last_updated DESC
-                    LIMIT ? OFFSET ?
-                """
-                cursor.execute(data_query, query_params + [limit, offset])
-                orders = [format_order_dict(row) for row in cursor.fetchall()]
-
-                pagination = create_pagination_info(page, total_count, limit)
-                currency_totals = OrdersDB.get_archived_orders_totals(
-                    status_filter, year_filter, month_filter
-                )
-
-                return orders, available_years, available_months, pagination, currency_totals
+                # bm25 weights follow the FTS column order: order_no, vendor,
+                # item_name, notes, tracking_no
+                search_query_sql = compiled_query('search', (SQL_FORMATTING, query_conditions), lambda: f"""
+                               SELECT {_listing_columns('o')}
+                               FROM orders_fts
+                                        JOIN orders o ON o.rowid = orders_fts.rowid
+                               WHERE orders_fts MATCH ?{query_conditions}
+                               ORDER BY bm25(orders_fts, 10.0, 4.0, 4.0, 1.0, 10.0),
+                                        o.order_date DESC
+                               LIMIT ? OFFSET ?
+                               """)
+                cursor.execute(search_query_sql, [match_expression] + query_params + [limit + 1, (page - 1) * limit])
+                rows = cursor.fetchall()
 
+                orders = OrderRecord.from_rows(rows[:limit])
+                return orders, create_page_pagination_info(page, limit, len(rows) > limit)
             except Exception as e:
-                logger.error(f"Error getting archived orders: {str(e)}", exc_info=True)
+                logger.error(f"Error searching orders for {search_query!r}: {str(e)}", exc_info=True)
                 raise
 
     @staticmethod
     def export_archived_orders(
             status_filter: Optional[str] = None,
-            date_filter: Optional[str] = None
-    ) -> List[sqlite3.Row]:
+            date_filter: Optional[str] = None,
+            batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[sqlite3.Row]:
         """
-        Export archived orders with optional filters
+        Stream archived orders with optional filters
+
+        Rows are read with fetchmany in batches of batch_size; the pooled
+        connection is held until the iterator is exhausted or closed.
         """
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             try:
-                query = """
-                        SELECT order_date, \
-                               vendor, \
-                               order_no, \
-                               item_name, \
+                year_filter, _, month_filter = (date_filter or '').partition('-')
+                status_conditions = build_status_filter_conditions(status_filter)
+                date_conditions = build_date_filter_conditions(year_filter, month_filter)
+                query_conditions, params = combine_filter_conditions(
+                    status_conditions, date_conditions
+                )
+
+                query = compiled_query('archive_export', query_conditions, lambda: f"""
+                        SELECT order_date,
+                               vendor,
+                               order_no,
+                               item_name,
                                quantity,
-                               currency, \
-                               amount, \
-                               shipped_date, \
-                               shipper, \
+                               currency,
+                               amount,
+                               shipped_date,
+                               shipper,
                                tracking_no,
-                               location, \
-                               last_updated, \
-                               notes, \
+                               location,
+                               last_updated,
+                               notes,
                                order_status
                         FROM orders
-                        WHERE order_status IN ('completed', 'cancelled')
-                        """
-                params = []
-
-                if status_filter:
-                    query += " AND order_status = ?"
-                    params.append(status_filter)
-
-                if date_filter:
-                    query += " AND strftime('%Y-%m', order_date) = ?"
-                    params.append(date_filter)
-
-                query += " ORDER BY order_date DESC"
+                        WHERE order_status IN ('completed', 'cancelled'){query_conditions}
+                        ORDER BY order_date DESC
+                        """)
 
                 cursor = conn.cursor()
                 cursor.execute(query, params)
-                return cursor.fetchall()
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
 
             except Exception as e:
                 logger.error(f"Error exporting archived orders: {str(e)}")
@@ -1,11 +1,22 @@
 from flask import Flask
 
+from config import METRICS_ENABLED
+
 
 def register_routes(app: Flask):
     """Register all route blueprints with the app."""
     from .active_orders import active_orders_bp
+    from .api import api_v1_bp
     from .archived_orders import archived_orders_bp
+    from .metrics import register_metrics
+    from .search import search_bp
+
+    # Instrument requests before any blueprint so every route is measured
+    if METRICS_ENABLED:
+        register_metrics(app)
 
     # Register blueprints with correct URL prefixes
     app.register_blueprint(active_orders_bp, url_prefix='/')
-    app.register_blueprint(archived_orders_bp, url_prefix='/archive')
\ No newline at end of file
+    app.register_blueprint(archived_orders_bp, url_prefix='/archive')
+    app.register_blueprint(search_bp, url_prefix='/search')
+    app.register_blueprint(api_v1_bp, url_prefix='/api/v1')
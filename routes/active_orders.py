@@ -1,13 +1,18 @@
 from flask import Blueprint, jsonify, redirect, render_template, request, url_for
 
-from config import logger
-from models.orders import OrdersDB
+from config import ACTIVE_PAGE_SIZE, logger
+from models.orders import DuplicateOrderError, OrdersDB
+from utils.conditional_get import conditional_get
 from utils.event_handlers import handle_api_error, handle_route_error
+from utils.import_helpers import import_error, parse_import_records, validate_import_records
+from utils.pagination import validate_limit
 from utils.request_helpers import extract_form_data, validate_required_fields
+from utils.response_cache import cache_response
 from utils.response_helpers import success_response, error_response
 from utils.route_helpers import (
     build_order_data_from_form,
     determine_redirect_source,
+    get_bulk_update_fields,
     get_order_form_fields,
     get_required_order_fields
 )
@@ -16,17 +21,45 @@ active_orders_bp = Blueprint('active_orders', __name__, template_folder='templat
 
 
 @active_orders_bp.route("/")
+@conditional_get(OrdersDB.get_last_updated)
+@cache_response
 def index():
     """
     Display active orders
     """
     try:
-        orders = OrdersDB.get_active_orders()
-        return render_template("index.html", orders=orders)
+        orders, pagination = OrdersDB.get_active_orders_page()
+        return render_template("index.html", orders=orders, pagination=pagination)
     except Exception as e:
         return handle_route_error(e, "index route", logger, "An error occurred loading the page")
 
 
+@active_orders_bp.route("/active_orders")
+@cache_response
+def active_orders():
+    """
+    Return the next page of active orders as JSON for incremental loading
+    """
+    try:
+        limit = validate_limit(request.args.get('limit'), default=ACTIVE_PAGE_SIZE)
+        orders, pagination = OrdersDB.get_active_orders_page(
+            limit=limit,
+            after=request.args.get('after')
+        )
+        return jsonify({
+            "success": True,
+            "orders": orders,
+            "pagination": pagination,
+            "next_cursor": pagination['next_cursor']
+        })
+    except Exception as e:
+        logger.error(f"Error loading active orders: {str(e)}", exc_info=True)
+        return jsonify({
+            "success": False,
+            "message": "An error occurred loading active orders"
+        }), 500
+
+
 @active_orders_bp.route("/form")
 def form():
     """
@@ -49,6 +82,26 @@ def check_order_no(order_no: str):
         return jsonify({"error": "Database error"}), 500
 
 
+@active_orders_bp.route("/check_order_nos", methods=["POST"])
+def check_order_nos():
+    """
+    Check many order numbers at once
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        order_nos = payload.get('order_nos')
+
+        if not isinstance(order_nos, list) or not order_nos:
+            return error_response("Expected a non-empty order_nos list", 400)
+
+        order_nos = [str(order_no) for order_no in order_nos]
+        existing = OrdersDB.find_existing_order_nos(order_nos)
+        return jsonify({"exists": {order_no: order_no in existing for order_no in order_nos}})
+    except Exception as e:
+        logger.error(f"Error checking order numbers: {str(e)}", exc_info=True)
+        return jsonify({"error": "Database error"}), 500
+
+
 @active_orders_bp.route("/submit_order", methods=["POST"])
 def submit_order():
     """
@@ -64,16 +117,61 @@ def submit_order():
                 400
             )
 
-        if OrdersDB.check_order_exists(form_data['order_no']):
+        # upsert=true makes a resubmission (e.g. a client retry) overwrite instead of failing
+        upsert = request.values.get('upsert', '').lower() in ('1', 'true', 'yes')
+        try:
+            OrdersDB.create_order(form_data, upsert=upsert)
+        except DuplicateOrderError:
             return error_response("An active order with this number already exists", 400)
-
-        OrdersDB.create_order(form_data)
         return success_response("Order created successfully!")
 
     except Exception as e:
         return handle_api_error(e, "submit_order", logger, "Server error occurred")
 
 
+@active_orders_bp.route("/import_orders", methods=["POST"])
+def import_orders():
+    """
+    Import many orders from a CSV upload or a JSON list
+    """
+    try:
+        try:
+            records = parse_import_records(request, get_order_form_fields())
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        for record in records:
+            record['order_status'] = record['order_status'] or 'active'
+
+        valid, errors = validate_import_records(records, get_required_order_fields())
+
+        existing = OrdersDB.find_existing_order_nos([records[i]['order_no'] for i in valid])
+        to_insert = []
+        for index in valid:
+            if records[index]['order_no'] in existing:
+                errors.append(import_error(index, records[index], "An order with this number already exists"))
+            else:
+                to_insert.append(index)
+
+        failures = OrdersDB.bulk_create_orders([records[i] for i in to_insert])
+        for position, message in failures.items():
+            index = to_insert[position]
+            errors.append(import_error(index, records[index], message))
+
+        errors.sort(key=lambda error: error['row'])
+        imported = len(to_insert) - len(failures)
+        return jsonify({
+            "success": not errors,
+            "message": f"Imported {imported} of {len(records)} orders",
+            "imported": imported,
+            "failed": len(errors),
+            "errors": errors
+        })
+
+    except Exception as e:
+        return handle_api_error(e, "import_orders", logger, "Server error occurred")
+
+
 @active_orders_bp.route("/update_order/<order_no>", methods=["POST"])
 def update_order(order_no: str):
     """
@@ -98,6 +196,35 @@ def update_order(order_no: str):
         }), 500
 
 
+@active_orders_bp.route("/bulk_update_orders", methods=["POST"])
+def bulk_update_orders():
+    """
+    Apply one change to many orders, e.g. mark a shipment's orders completed
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        order_nos = payload.get('order_nos')
+        changes = payload.get('changes')
+
+        if not isinstance(order_nos, list) or not order_nos or not isinstance(changes, dict) or not changes:
+            return error_response("Expected a non-empty order_nos list and changes object", 400)
+
+        allowed_fields = get_bulk_update_fields()
+        unknown_fields = [field for field in changes if field not in allowed_fields]
+        if unknown_fields:
+            return error_response(f"Fields cannot be bulk updated: {', '.join(unknown_fields)}", 400)
+
+        changes = {field: '' if value is None else str(value).strip() for field, value in changes.items()}
+        if 'shipper' in changes:
+            changes['shipper'] = changes['shipper'].upper()
+
+        updated = OrdersDB.bulk_update_orders([str(order_no) for order_no in order_nos], changes)
+        return success_response(f"Updated {updated} orders", updated=updated)
+
+    except Exception as e:
+        return handle_api_error(e, "bulk_update_orders", logger, "Server error occurred")
+
+
 @active_orders_bp.route("/edit_order/<order_no>")
 def edit_order(order_no: str):
     """
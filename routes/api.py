@@ -0,0 +1,80 @@
+from flask import Blueprint, jsonify, request
+
+from config import logger
+from models.orders import OrdersDB
+from utils.conditional_get import conditional_get
+from utils.event_handlers import handle_api_error
+from utils.order_helpers import get_order_columns
+from utils.pagination import validate_limit
+from utils.request_helpers import extract_fields, extract_filters
+from utils.response_cache import cache_response
+from utils.response_helpers import error_response
+
+api_v1_bp = Blueprint('api_v1', __name__)
+
+
+@api_v1_bp.route('/orders')
+@conditional_get(OrdersDB.get_last_updated)
+@cache_response
+def list_orders():
+    """
+    Return a page of orders of any status with only the requested fields
+    """
+    try:
+        try:
+            fields = extract_fields(request, get_order_columns())
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        filters = extract_filters(request)
+        orders, pagination = OrdersDB.get_orders_fields_page(
+            fields,
+            status_filter=filters['status_filter'],
+            year_filter=filters['year_filter'],
+            month_filter=filters['month_filter'],
+            limit=validate_limit(request.args.get('limit')),
+            after=request.args.get('after')
+        )
+        return jsonify({"success": True, "orders": orders, "pagination": pagination})
+    except Exception as e:
+        return handle_api_error(e, "api list_orders", logger, "An error occurred loading orders")
+
+
+@api_v1_bp.route('/orders/<order_no>')
+@conditional_get(OrdersDB.get_last_updated)
+@cache_response
+def get_order(order_no: str):
+    """
+    Return one order with only the requested fields
+    """
+    try:
+        try:
+            fields = extract_fields(request, get_order_columns())
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        order = OrdersDB.get_order_fields(order_no, fields)
+        if order is None:
+            return error_response("Order not found", 404)
+        return jsonify({"success": True, "order": order})
+    except Exception as e:
+        return handle_api_error(e, "api get_order", logger, "An error occurred loading the order")
+
+
+@api_v1_bp.route('/totals')
+@conditional_get(OrdersDB.get_last_updated)
+@cache_response
+def totals():
+    """
+    Return currency totals for orders of any status with filters applied
+    """
+    try:
+        filters = extract_filters(request)
+        currency_totals = OrdersDB.get_orders_totals(
+            status_filter=filters['status_filter'],
+            year_filter=filters['year_filter'],
+            month_filter=filters['month_filter']
+        )
+        return jsonify({"success": True, "totals": currency_totals})
+    except Exception as e:
+        return handle_api_error(e, "api totals", logger, "An error occurred loading totals")
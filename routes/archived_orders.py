@@ -2,15 +2,25 @@ from flask import Blueprint, render_template, request, jsonify
 
 from config import logger
 from models.orders import OrdersDB
-from utils.csv_helpers import create_csv_response, build_export_filename
+from utils.conditional_get import conditional_get
+from utils.csv_helpers import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_FORMATS,
+    build_export_filename,
+    create_export_response
+)
 from utils.event_handlers import handle_route_error
 from utils.pagination import validate_page_number
 from utils.request_helpers import extract_filters
+from utils.response_helpers import error_response
+from utils.response_cache import cache_response
 
 archived_orders_bp = Blueprint('archived_orders', __name__, template_folder='templates')
 
 
 @archived_orders_bp.route('')
+@conditional_get(OrdersDB.get_last_updated)
+@cache_response
 def archive():
     """
     Display archived orders with pagination
@@ -27,10 +37,15 @@ def archive():
             year_filter=filters['year_filter'],
             month_filter=filters['month_filter'],
             page=page,
-            limit=limit
+            limit=limit,
+            after=request.args.get('after'),
+            before=request.args.get('before')
         )
 
-        logger.info(f"Retrieved {len(orders)} archived orders (page {page} of {pagination['total_pages']})")
+        if 'total_pages' in pagination:
+            logger.info(f"Retrieved {len(orders)} archived orders (page {page} of {pagination['total_pages']})")
+        else:
+            logger.info(f"Retrieved {len(orders)} archived orders from a cursor")
         logger.info(f"Currency totals: {currency_totals}")
 
         # Check if this is an AJAX request
@@ -40,6 +55,8 @@ def archive():
                 'success': True,
                 'orders': orders,
                 'pagination': pagination,
+                'next_cursor': pagination['next_cursor'],
+                'prev_cursor': pagination['prev_cursor'],
                 'currency_totals': currency_totals,
                 'table_html': render_template('components/archive_table.html',
                                               orders=orders,
@@ -68,11 +85,19 @@ def archive():
 
 
 @archived_orders_bp.route('/export_csv')
+@conditional_get(OrdersDB.get_last_updated)
 def export_archive_csv():
     """
-    Export archived orders to CSV
+    Export archived orders as CSV or NDJSON (format=), optionally gzip-compressed (compression=)
     """
     try:
+        export_format = request.args.get('format') or 'csv'
+        compression = request.args.get('compression') or None
+        if export_format not in EXPORT_FORMATS:
+            return error_response(f"Unsupported export format: {export_format}", 400)
+        if compression is not None and compression not in EXPORT_COMPRESSIONS:
+            return error_response(f"Unsupported compression: {compression}", 400)
+
         # Extract filters
         status_filter = request.args.get('status')
         year_filter = request.args.get('year')
@@ -95,12 +120,14 @@ def export_archive_csv():
 
         filename = build_export_filename(
             'archived_orders',
+            export_format,
+            compression,
             status=status_filter,
             year=year_filter,
             month=month_filter
         )
 
-        return create_csv_response(archived_orders, headers, filename)
+        return create_export_response(archived_orders, headers, filename, export_format, compression)
 
     except Exception as e:
         return handle_route_error(e, 'export_archive_csv', logger, 'Error exporting archive')
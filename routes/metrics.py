@@ -0,0 +1,136 @@
+import time
+from typing import Optional
+
+from flask import Blueprint, Flask, Response, g, request
+
+from config import ORDER_INDEX_ENABLED, WRITE_QUEUE_ENABLED
+from models.orders import OrdersDB
+from utils.database import get_pool
+from utils.metrics import end_request_stats, observe_request, render_metrics, start_request_stats
+from utils.order_index import get_order_index
+from utils.query_registry import get_query_registry
+from utils.response_cache import get_response_cache
+from utils.write_queue import get_write_queue
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('')
+def metrics():
+    """
+    Expose request, SQL and OrdersDB metrics in Prometheus text format
+    """
+    pool = get_pool().stats()
+    queries = get_query_registry().stats()
+    facets = OrdersDB.get_facet_cache_stats()
+    responses = get_response_cache().stats()
+    samples = [
+        ('parcels_db_pool_max_connections', 'gauge', 'Configured read-only connection pool size.', pool['max_size']),
+        ('parcels_db_pool_open_connections', 'gauge', 'Read-only connections currently open.', pool['open']),
+        ('parcels_db_pool_idle_connections', 'gauge', 'Open read-only connections waiting in the pool.', pool['idle']),
+        ('parcels_query_registry_queries', 'gauge', 'Compiled query shapes.', queries['queries']),
+        ('parcels_query_registry_hits_total', 'counter', 'Query registry lookups served from cache.',
+         queries['hits']),
+        ('parcels_query_registry_misses_total', 'counter', 'Query registry lookups that compiled SQL.',
+         queries['misses']),
+        ('parcels_query_registry_evictions_total', 'counter', 'Compiled queries evicted from the registry.',
+         queries['evictions']),
+        ('parcels_facet_cache_hits_total', 'counter', 'Archive facet cache hits.', facets['hits']),
+        ('parcels_facet_cache_misses_total', 'counter', 'Archive facet cache misses.', facets['misses']),
+        ('parcels_response_cache_entries', 'gauge', 'Rendered responses cached.', responses['entries']),
+        ('parcels_response_cache_bytes', 'gauge', 'Estimated memory held by cached responses.', responses['bytes']),
+        ('parcels_response_cache_hits_total', 'counter', 'Responses served from cache.', responses['hits']),
+        ('parcels_response_cache_misses_total', 'counter', 'Cacheable responses rendered.', responses['misses']),
+        ('parcels_response_cache_evictions_total', 'counter', 'Responses evicted to stay within the memory bound.',
+         responses['evictions']),
+    ]
+    if ORDER_INDEX_ENABLED:
+        order_index = get_order_index().stats()
+        samples += [
+            ('parcels_order_index_numbers', 'gauge', 'Order numbers held in the in-memory index.',
+             order_index['order_numbers']),
+            ('parcels_order_index_loads_total', 'counter', 'Full loads of the order number index.',
+             order_index['loads']),
+            ('parcels_order_index_catch_ups_total', 'counter', 'Incremental order number index refreshes.',
+             order_index['catch_ups']),
+        ]
+    if WRITE_QUEUE_ENABLED:
+        writes = get_write_queue().stats()
+        samples += [
+            ('parcels_write_queue_batches_total', 'counter', 'Group-commit batches committed.', writes['batches']),
+            ('parcels_write_queue_operations_total', 'counter', 'Writes committed through the write queue.',
+             writes['operations']),
+            ('parcels_write_queue_pending', 'gauge', 'Writes waiting for the next batch.', writes['pending']),
+        ]
+    return Response(render_metrics(samples), mimetype='text/plain; version=0.0.4')
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_stats = start_request_stats()
+
+
+def _after_request(response: Response) -> Response:
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+
+    stats = g.metrics_stats
+    endpoint = request.endpoint or 'unmatched'
+    method = request.method
+
+    if not response.is_streamed:
+        observe_request(endpoint, method, response.status_code,
+                        time.perf_counter() - start, stats, response.calculate_content_length())
+        return response
+
+    # Streamed bodies (exports) do their SQL work while the response is being
+    # sent, so finish the measurement once the server closes the response
+    g.metrics_streamed = True
+    sent = [0]
+    finished = [False]
+    body = response.response
+
+    def counting_body():
+        for chunk in body:
+            sent[0] += len(chunk)
+            yield chunk
+        finish()
+
+    def finish():
+        # After the last chunk, or on close if the client went away first
+        if finished[0]:
+            return
+        finished[0] = True
+        end_request_stats()
+        observe_request(endpoint, method, response.status_code,
+                        time.perf_counter() - start, stats, sent[0])
+
+    response.response = counting_body()
+    response.call_on_close(finish)
+    return response
+
+
+def _teardown_request(exc: Optional[BaseException]):
+    # Runs however the request ended, so a failed request never leaves its
+    # measurement open for the next one on this thread
+    stats = g.pop('metrics_stats', None)
+    if stats is None or g.pop('metrics_streamed', False):
+        return
+
+    end_request_stats()
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        # after_request never ran, so no response was produced
+        observe_request(request.endpoint or 'unmatched', request.method, 500,
+                        time.perf_counter() - start, stats, None)
+
+
+def register_metrics(app: Flask):
+    """
+    Instrument every request and serve the results at /metrics
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
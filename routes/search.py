@@ -0,0 +1,52 @@
+from flask import Blueprint, jsonify, render_template, request
+
+from config import logger
+from models.orders import OrdersDB
+from utils.event_handlers import handle_route_error
+from utils.pagination import validate_limit, validate_page_number
+from utils.request_helpers import extract_filters
+
+search_bp = Blueprint('search', __name__, template_folder='templates')
+
+
+@search_bp.route('')
+def search():
+    """
+    Search all orders by vendor, item name, notes, tracking or order number
+    """
+    try:
+        search_query = request.args.get('q', '').strip()
+        filters = extract_filters(request)
+        page = validate_page_number(request.args.get('page', 1))
+        limit = validate_limit(request.args.get('limit'), default=20, maximum=100)
+
+        orders, pagination = OrdersDB.search(
+            search_query,
+            status_filter=filters['status_filter'],
+            year_filter=filters['year_filter'],
+            month_filter=filters['month_filter'],
+            page=page,
+            limit=limit
+        )
+
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return jsonify({
+                'success': True,
+                'query': search_query,
+                'orders': orders,
+                'pagination': pagination
+            })
+
+        return render_template(
+            'search.html',
+            query=search_query,
+            orders=orders,
+            pagination=pagination
+        )
+    except Exception as e:
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return jsonify({
+                'success': False,
+                'error': 'An error occurred while searching'
+            }), 500
+        return handle_route_error(e, 'search route', logger, 'An error occurred while searching')
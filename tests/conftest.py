@@ -0,0 +1,53 @@
+import pytest
+from flask import Flask
+
+from routes import register_routes
+from utils.data_version import get_data_version
+from utils.database import close_pool, init_pool
+from utils.json_provider import AppJSONProvider
+from utils.migrations import apply_migrations
+from utils.response_cache import get_response_cache
+from utils.write_queue import close_write_queue
+
+
+def make_order(order_no: str, **overrides) -> dict:
+    """
+    Order form data with every required field filled in
+    """
+    order = {
+        'order_date': '2024-03-01', 'vendor': 'Test Vendor', 'order_no': order_no,
+        'item_name': 'Test item', 'quantity': '1', 'currency': 'USD', 'amount': '10.00',
+        'color': 'blue', 'shipped_date': '', 'shipper': '', 'tracking_no': '',
+        'location': '', 'delivery': '', 'notes': '', 'order_status': 'active'
+    }
+    order.update(overrides)
+    return order
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    A freshly migrated database that the process-wide pool points at
+    """
+    path = str(tmp_path / 'orders.sqlite')
+    init_pool(path)
+    apply_migrations()
+    # Re-point the data version watcher now, so the switch does not count as a change mid-test
+    get_data_version()
+    get_response_cache().clear()
+    yield path
+    close_write_queue()
+    close_pool()
+    get_response_cache().clear()
+
+
+@pytest.fixture
+def client(database):
+    """
+    A test client for the application's routes, as create_app() registers them
+    """
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.json = AppJSONProvider(app)
+    register_routes(app)
+    return app.test_client()
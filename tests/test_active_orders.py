@@ -0,0 +1,72 @@
+from conftest import make_order
+from models.orders import OrdersDB
+from utils.data_version import get_data_version
+
+
+def test_active_page_cursor_walks_every_order(database):
+    for number in range(7):
+        OrdersDB.create_order(make_order(f"PO-{number}", order_date='2024-02-01'))
+
+    seen, after = [], None
+    while True:
+        orders, pagination = OrdersDB.get_active_orders_page(limit=3, after=after)
+        seen.extend(order['order_no'] for order in orders)
+        after = pagination['next_cursor']
+        if after is None:
+            break
+
+    assert sorted(seen) == [f"PO-{number}" for number in range(7)]
+    assert len(seen) == len(set(seen))
+
+
+def test_load_more_endpoint_follows_cursor(client):
+    for number in range(5):
+        OrdersDB.create_order(make_order(f"PO-{number}"))
+
+    first = client.get('/active_orders?limit=3').json
+    second = client.get(f"/active_orders?limit=3&after={first['next_cursor']}").json
+
+    numbers = [order['order_no'] for order in first['orders'] + second['orders']]
+    assert sorted(numbers) == [f"PO-{number}" for number in range(5)]
+    assert second['next_cursor'] is None
+
+
+def test_bulk_update_rejects_fields_outside_whitelist(client):
+    OrdersDB.create_order(make_order('PO-1'))
+
+    response = client.post('/bulk_update_orders', json={'order_nos': ['PO-1'], 'changes': {'amount': '0.01'}})
+    assert response.status_code == 400
+    assert 'amount' in response.json['message']
+    assert client.post('/bulk_update_orders', json={'order_nos': [], 'changes': {'location': 'x'}}).status_code == 400
+    assert OrdersDB.get_order('PO-1')['amount'] == '10.00'
+
+
+def test_bulk_update_counts_only_existing_orders(client):
+    for number in range(3):
+        OrdersDB.create_order(make_order(f"PO-{number}"))
+
+    response = client.post('/bulk_update_orders', json={
+        'order_nos': ['PO-0', 'PO-2', 'PO-404'],
+        'changes': {'order_status': 'completed', 'shipper': 'ups'}
+    })
+
+    assert response.json['success'] and response.json['updated'] == 2
+    assert [OrdersDB.get_order(f"PO-{number}")['order_status'] for number in range(3)] == \
+           ['completed', 'active', 'completed']
+    assert OrdersDB.get_order('PO-0')['shipper'] == 'UPS'
+
+
+def test_bulk_update_invalidates_cached_responses_and_etags(client):
+    OrdersDB.create_order(make_order('PO-1'))
+    before = client.get('/api/v1/orders/PO-1?fields=order_status')
+    assert before.json['order']['order_status'] == 'active'
+    version = get_data_version()
+
+    client.post('/bulk_update_orders', json={'order_nos': ['PO-1'], 'changes': {'order_status': 'completed'}})
+
+    assert get_data_version() != version
+
+    after = client.get('/api/v1/orders/PO-1?fields=order_status', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.json['order']['order_status'] == 'completed'
@@ -0,0 +1,59 @@
+import itertools
+
+from conftest import make_order
+from models.orders import OrdersDB
+from utils.order_helpers import get_order_columns
+from utils.query_registry import get_query_registry
+
+
+def test_fields_selects_only_requested_columns(client):
+    OrdersDB.create_order(make_order('PO-1'))
+
+    response = client.get('/api/v1/orders/PO-1?fields=amount,order_no')
+
+    assert response.status_code == 200
+    assert response.json['order'] == {'order_no': 'PO-1', 'amount': '10.00'}
+
+
+def test_unknown_field_is_rejected(client):
+    response = client.get('/api/v1/orders?fields=order_no,password')
+
+    assert response.status_code == 400
+
+
+def test_field_order_does_not_create_new_queries(client):
+    OrdersDB.create_order(make_order('PO-1'))
+    client.get('/api/v1/orders?fields=order_no,amount,vendor')
+    queries = get_query_registry().stats()['queries']
+
+    for permutation in itertools.permutations(['order_no', 'amount', 'vendor']):
+        client.get(f"/api/v1/orders?fields={','.join(permutation)}")
+
+    assert get_query_registry().stats()['queries'] == queries
+
+
+def test_many_field_sets_keep_registry_bounded(client):
+    registry = get_query_registry()
+    columns = get_order_columns()
+
+    for size in (1, 2, 3):
+        for fields in itertools.combinations(columns, size):
+            response = client.get(f"/api/v1/orders?fields={','.join(fields)}&status=active")
+            assert response.status_code == 200
+
+    assert registry.stats()['queries'] <= registry.max_size
+    assert registry.stats()['evictions'] > 0
+
+
+def test_api_cursor_walks_every_order(client):
+    for number in range(5):
+        OrdersDB.create_order(make_order(f"PO-{number}"))
+
+    seen, url = [], '/api/v1/orders?fields=order_no&limit=2'
+    while url:
+        body = client.get(url).json
+        seen.extend(order['order_no'] for order in body['orders'])
+        cursor = body['pagination']['next_cursor']
+        url = f"/api/v1/orders?fields=order_no&limit=2&after={cursor}" if cursor else None
+
+    assert sorted(seen) == [f"PO-{number}" for number in range(5)]
@@ -0,0 +1,68 @@
+import sqlite3
+
+import utils.conditional_get
+import utils.data_version
+from conftest import make_order
+from models.orders import OrdersDB
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def test_responses_vary_on_ajax_header(client):
+    OrdersDB.create_order(make_order('PO-1'))
+
+    full = client.get('/api/v1/totals')
+    cached = client.get('/api/v1/totals')
+    not_modified = client.get('/api/v1/totals', headers={'If-None-Match': full.headers['ETag']})
+
+    assert (full.status_code, cached.status_code, not_modified.status_code) == (200, 200, 304)
+    for response in (full, cached, not_modified):
+        assert 'X-Requested-With' in response.vary
+
+
+def test_ajax_and_full_requests_get_different_etags(client):
+    full = client.get('/api/v1/totals')
+    ajax = client.get('/api/v1/totals', headers=AJAX)
+
+    assert full.headers['ETag'] != ajax.headers['ETag']
+    assert client.get('/api/v1/totals', headers=dict(AJAX, **{'If-None-Match': full.headers['ETag']})).status_code == 200
+
+
+def test_cache_only_listing_varies_on_ajax_header(client):
+    assert 'X-Requested-With' in client.get('/active_orders').vary
+    assert 'X-Requested-With' in client.get('/active_orders').vary
+
+
+def test_write_invalidates_etag(client):
+    etag = client.get('/api/v1/totals').headers['ETag']
+
+    OrdersDB.create_order(make_order('PO-1'))
+
+    assert client.get('/api/v1/totals', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_write_from_another_process_invalidates_etag(client, database):
+    etag = client.get('/api/v1/totals').headers['ETag']
+
+    with sqlite3.connect(database) as conn:
+        conn.execute(
+            "INSERT INTO orders (order_date, vendor, order_no, item_name, currency, amount, color, last_updated) "
+            "VALUES ('2024-01-01', 'V', 'PO-9', 'I', 'USD', '1.00', 'red', '2024-01-01')"
+        )
+    conn.close()
+
+    assert client.get('/api/v1/totals', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_validators_survive_a_restart(client, monkeypatch):
+    OrdersDB.create_order(make_order('PO-1'))
+    first = client.get('/api/v1/totals')
+
+    # A fresh process starts with its own data version stamp and no cached validators
+    monkeypatch.setattr(utils.data_version, '_data_version', utils.data_version.DataVersion())
+    monkeypatch.setattr(utils.data_version, '_change_stamp', (None, 0, 0.0))
+    monkeypatch.setattr(utils.conditional_get, '_last_modified', (None, None))
+    second = client.get('/api/v1/totals', headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
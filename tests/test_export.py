@@ -0,0 +1,63 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from conftest import make_order
+from models.orders import OrdersDB
+
+# Enough rows to span several fetch batches and stream chunks
+ORDER_COUNT = 1500
+
+
+@pytest.fixture
+def archive(database):
+    orders = [
+        make_order(f"PO-{number:05d}", order_status='completed' if number % 3 else 'cancelled',
+                   notes=f'Line "{number}", naïve café\tdone', amount=f"{number}.25")
+        for number in range(ORDER_COUNT)
+    ]
+    assert OrdersDB.bulk_create_orders(orders) == {}
+    OrdersDB.create_order(make_order('PO-ACTIVE'))
+    return {order['order_no']: order for order in orders}
+
+
+def export(client, **args):
+    response = client.get('/archive/export_csv', query_string=args)
+    assert response.status_code == 200
+    return response
+
+
+def test_gzipped_ndjson_round_trips_every_row(client, archive):
+    response = export(client, format='ndjson', compression='gzip')
+
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'].endswith('archived_orders.ndjson.gz')
+    lines = gzip.decompress(response.data).decode('utf-8').split('\n')
+    assert lines[-1] == ''
+    rows = [json.loads(line) for line in lines[:-1]]
+
+    assert sorted(row['order_no'] for row in rows) == sorted(archive)
+    for row in rows:
+        order = archive[row['order_no']]
+        assert (row['notes'], row['amount'], row['order_status']) == \
+               (order['notes'], order['amount'], order['order_status'])
+
+
+def test_gzipped_csv_matches_plain_csv(client, archive):
+    plain = export(client, status='cancelled').data
+    compressed = export(client, status='cancelled', compression='gzip').data
+
+    assert gzip.decompress(compressed) == plain
+    rows = list(csv.DictReader(io.StringIO(plain.decode('utf-8'))))
+    assert len(rows) == len([order for order in archive.values() if order['order_status'] == 'cancelled'])
+
+
+@pytest.mark.parametrize('args', [{'format': 'xml'}, {'compression': 'br'}, {'format': 'ndjson', 'compression': 'zip'}])
+def test_unknown_format_or_compression_is_rejected(client, args):
+    response = client.get('/archive/export_csv', query_string=args)
+
+    assert response.status_code == 400
+    assert not response.json['success']
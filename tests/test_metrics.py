@@ -0,0 +1,89 @@
+import re
+
+import pytest
+from flask import request
+
+import utils.metrics
+from conftest import make_order
+from models.orders import OrdersDB
+
+SAMPLE = re.compile(r'^(\S+?)(\{.*\})? (\S+)$')
+
+
+def scrape(client):
+    """
+    Parse /metrics into {(name, labels): value}
+    """
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line and not line.startswith('#'):
+            name, labels, value = SAMPLE.match(line).groups()
+            samples[name, labels or ''] = float(value)
+    return samples
+
+
+def delta(before, after, name, labels=''):
+    return after.get((name, labels), 0) - before.get((name, labels), 0)
+
+
+@pytest.fixture
+def failing_client(client):
+    app = client.application
+
+    @app.route('/boom')
+    def boom():
+        return 'ok'
+
+    @app.after_request
+    def break_response(response):
+        if request.path == '/boom':
+            raise RuntimeError('after_request failed')
+        return response
+
+    return client
+
+
+def test_requests_and_their_sql_work_are_counted(client):
+    OrdersDB.create_order(make_order('PO-1'))
+    before = scrape(client)
+
+    client.get('/api/v1/totals')
+    client.get('/api/v1/totals')
+    client.get('/api/v1/orders/PO-404')
+    after = scrape(client)
+
+    totals = '{endpoint="api_v1.totals",method="GET",status="200"}'
+    assert delta(before, after, 'parcels_http_requests_total', totals) == 2
+    assert delta(before, after, 'parcels_http_requests_total',
+                 '{endpoint="api_v1.get_order",method="GET",status="404"}') == 1
+    assert delta(before, after, 'parcels_http_request_sql_statements_count', '{endpoint="api_v1.totals"}') == 2
+    assert delta(before, after, 'parcels_http_request_sql_statements_sum', '{endpoint="api_v1.totals"}') >= 1
+    assert delta(before, after, 'parcels_response_cache_hits_total') == 1
+    assert delta(before, after, 'parcels_response_cache_misses_total') == 2
+
+
+def test_streamed_export_is_measured_once_the_body_is_sent(client):
+    OrdersDB.create_order(make_order('PO-1', order_status='completed'))
+    before = scrape(client)
+
+    response = client.get('/archive/export_csv')
+    body = response.get_data()
+    response.close()
+    after = scrape(client)
+
+    export = '{endpoint="archived_orders.export_archive_csv"}'
+    assert delta(before, after, 'parcels_http_response_bytes_sum', export) == len(body)
+    assert delta(before, after, 'parcels_http_request_rows_fetched_sum', export) >= 1
+    assert utils.metrics._request_stats.get() is None
+
+
+def test_failed_request_still_closes_its_measurement(failing_client):
+    before = scrape(failing_client)
+
+    assert failing_client.get('/boom').status_code == 500
+
+    assert utils.metrics._request_stats.get() is None
+    after = scrape(failing_client)
+    assert delta(before, after, 'parcels_http_requests_total', '{endpoint="boom",method="GET",status="500"}') == 1
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+import utils.data_version
+from conftest import make_order
+from models.orders import OrdersDB
+from utils.order_index import OrderNumberIndex
+
+
+def insert_externally(database, order_no):
+    """
+    Commit an order on a separate connection, as another worker process would
+    """
+    with sqlite3.connect(database) as conn:
+        conn.execute(
+            "INSERT INTO orders (order_date, vendor, order_no, item_name, currency, amount, color, last_updated) "
+            "VALUES ('2024-01-01', 'V', ?, 'I', 'USD', '1.00', 'red', '2024-01-01')", (order_no,)
+        )
+    conn.close()
+
+
+@pytest.fixture
+def polls(monkeypatch):
+    """
+    Count how often the data version is read from SQLite
+    """
+    counter = {'polls': 0}
+    data_version = utils.data_version._data_version
+    poll = data_version._poll_external
+
+    def counting_poll():
+        counter['polls'] += 1
+        return poll()
+
+    monkeypatch.setattr(data_version, '_poll_external', counting_poll)
+    return counter
+
+
+def test_misses_do_not_query_sqlite(database, polls):
+    OrdersDB.create_order(make_order('PO-1'))
+    index = OrderNumberIndex(refresh_ms=60000)
+    index.refresh()
+    polls['polls'] = 0
+
+    for number in range(100):
+        assert not index.might_contain(f"MISSING-{number}")
+    assert index.candidates(['PO-1', 'MISSING']) == ['PO-1']
+
+    assert polls['polls'] == 0
+
+
+def test_own_writes_are_seen_immediately(database):
+    index = OrderNumberIndex(refresh_ms=60000)
+    assert not index.might_contain('PO-1')
+
+    OrdersDB.create_order(make_order('PO-1'))
+
+    assert index.might_contain('PO-1')
+    assert OrdersDB.check_order_exists('PO-1')
+
+
+def test_external_writes_are_seen_after_refresh_interval(database):
+    index = OrderNumberIndex(refresh_ms=60000)
+    assert not index.might_contain('PO-1')
+
+    insert_externally(database, 'PO-1')
+    assert not index.might_contain('PO-1')
+
+    index._checked_at -= 61
+    assert index.might_contain('PO-1')
+
+
+def test_external_writes_are_seen_at_once_without_interval(database):
+    index = OrderNumberIndex(refresh_ms=0)
+    assert not index.might_contain('PO-1')
+
+    insert_externally(database, 'PO-1')
+
+    assert index.might_contain('PO-1')
+
+
+def test_reused_high_water_rowid_reloads(database):
+    OrdersDB.create_order(make_order('PO-1'))
+    OrdersDB.create_order(make_order('PO-2'))
+    index = OrderNumberIndex(refresh_ms=0)
+    index.refresh()
+    loads = index.loads
+
+    # Deleting the newest order frees its rowid for the next insert
+    OrdersDB.delete_order('PO-2')
+    insert_externally(database, 'PO-3')
+
+    assert index.might_contain('PO-3')
+    assert index.loads == loads + 1
+
+
+def test_order_number_check_sees_other_workers_commits_by_default(client, database):
+    assert not client.get('/check_order_no/PO-1').json['exists']
+
+    insert_externally(database, 'PO-1')
+
+    assert client.get('/check_order_no/PO-1').json['exists']
+    assert client.post('/check_order_nos', json={'order_nos': ['PO-1']}).json['exists'] == {'PO-1': True}
@@ -0,0 +1,79 @@
+import pytest
+
+import models.orders
+from models.orders import OrdersDB
+from utils.database import get_db_connection, get_read_connection
+from utils.order_helpers import OrderRecord, format_order_dict
+
+# (order_no, currency, amount, shipper, tracking_no, notes); NULLs where the schema allows them
+ORDERS = [
+    ('PO-1', 'USD', '1234.5', 'FEDEX', '123456789012', 'Gift'),
+    ('PO-2', 'JPY', '150000', None, None, None),
+    ('PO-3', 'EUR', 'n/a', 'FedEx', 'AB 12/34?', ''),
+    ('PO-4', 'USD', '-0.005', 'UPS', '1Z999AA10123456784', None),
+    ('PO-5', 'JPY', '', 'FEDEX', None, None),
+    ('PO-6', 'USD', '7', '', '123', None),
+]
+
+
+@pytest.fixture
+def rows(database):
+    with get_db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO orders (order_date, vendor, order_no, item_name, currency, amount, color, "
+            "shipper, tracking_no, notes, last_updated, order_status) "
+            "VALUES ('2024-01-01', 'V', ?, 'I', ?, ?, 'red', ?, ?, ?, '2024-01-02', 'completed')", ORDERS
+        )
+        conn.commit()
+    with get_read_connection() as conn:
+        plain = conn.execute("SELECT * FROM orders ORDER BY rowid").fetchall()
+        helper = conn.execute("SELECT rowid AS order_rowid, * FROM orders ORDER BY rowid").fetchall()
+    return plain, helper
+
+
+def test_records_match_format_order_dict(rows):
+    plain, helper = rows
+    expected = [format_order_dict(row) for row in plain]
+
+    records = OrderRecord.from_rows(helper, exclude=('order_rowid',))
+
+    assert [record.to_dict() for record in records] == expected
+    assert [dict(record) for record in records] == expected
+    for record, order in zip(records, expected):
+        assert len(record) == len(order)
+        assert all(record[key] == value for key, value in order.items())
+        assert ('tracking_url' in record) == ('tracking_url' in order)
+
+
+def test_carrier_urls_ignore_shipper_case(rows):
+    records = OrderRecord.from_rows(rows[0])
+
+    assert records[0]['tracking_url'] == 'https://www.fedex.com/fedextrack/?trknbr=123456789012'
+    assert records[2]['tracking_url'] == 'https://www.fedex.com/fedextrack/?trknbr=AB%2012/34%3F'
+    assert records[3]['tracking_url'] is None
+    assert 'tracking_url' not in records[1]
+
+
+def listings():
+    with get_db_connection() as conn:
+        conn.execute("UPDATE orders SET order_status = 'active' WHERE order_no IN ('PO-2', 'PO-4')")
+        conn.commit()
+    return {
+        'active': OrdersDB.get_active_orders(),
+        'archive': OrdersDB.get_archived_orders(limit=50)[0],
+        'search': OrdersDB.search('V', limit=50)[0],
+    }
+
+
+def test_sql_formatting_matches_python_formatting(rows, monkeypatch):
+    python_formatted = {name: [dict(order) for order in orders] for name, orders in listings().items()}
+
+    monkeypatch.setattr(models.orders, 'SQL_FORMATTING', True)
+    sql_formatted = {name: [dict(order) for order in orders] for name, orders in listings().items()}
+
+    assert [len(orders) for orders in sql_formatted.values()] == [2, 4, 6]
+    for name, orders in python_formatted.items():
+        # SQL rows always carry tracking_url, blank when there is no link
+        expected = [dict(order, tracking_url=order.get('tracking_url') or '') for order in orders]
+        assert sql_formatted[name] == expected, name
+    assert sql_formatted['archive'][-1]['tracking_url'].endswith('trknbr=123456789012')
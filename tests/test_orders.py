@@ -0,0 +1,185 @@
+import sqlite3
+
+import pytest
+from flask import Flask
+
+from conftest import make_order
+from models.orders import DuplicateOrderError, OrdersDB
+from utils.commands import register_commands
+from utils.database import close_pool, get_db_connection, get_read_connection, init_pool
+from utils.migrations import apply_migrations, get_schema_version
+
+
+def test_create_rejects_taken_order_number(database):
+    OrdersDB.create_order(make_order('PO-1'))
+
+    with pytest.raises(DuplicateOrderError):
+        OrdersDB.create_order(make_order('PO-1', vendor='Other Vendor'))
+
+    assert OrdersDB.get_order('PO-1')['vendor'] == 'Test Vendor'
+
+
+def test_upsert_overwrites_existing_order(database):
+    OrdersDB.create_order(make_order('PO-1'))
+
+    OrdersDB.create_order(make_order('PO-1', vendor='Other Vendor'), upsert=True)
+    OrdersDB.create_order(make_order('PO-1', vendor='Other Vendor'), upsert=True)
+
+    assert OrdersDB.get_order('PO-1')['vendor'] == 'Other Vendor'
+    with get_read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 1
+
+
+def test_submit_order_duplicate_and_upsert(client):
+    assert client.post('/submit_order', data=make_order('PO-1')).json['success']
+
+    duplicate = client.post('/submit_order', data=make_order('PO-1'))
+    assert duplicate.status_code == 400
+
+    upsert = client.post('/submit_order?upsert=true', data=make_order('PO-1', vendor='Other Vendor'))
+    assert upsert.json['success']
+    assert OrdersDB.get_order('PO-1')['vendor'] == 'Other Vendor'
+
+
+def test_bulk_create_reports_only_conflicting_rows(database):
+    OrdersDB.create_order(make_order('PO-2'))
+
+    failures = OrdersDB.bulk_create_orders([make_order('PO-1'), make_order('PO-2'), make_order('PO-3')])
+
+    assert failures == {1: "An order with this number already exists"}
+    assert OrdersDB.find_existing_order_nos(['PO-1', 'PO-2', 'PO-3']) == {'PO-1', 'PO-2', 'PO-3'}
+    assert OrdersDB.get_order('PO-2')['vendor'] == 'Test Vendor'
+
+
+def test_import_reports_order_created_after_its_check(client, monkeypatch):
+    # Another request creates PO-2 between the route's existence check and the insert
+    OrdersDB.create_order(make_order('PO-2'))
+    monkeypatch.setattr(OrdersDB, 'find_existing_order_nos', staticmethod(lambda order_nos: set()))
+
+    response = client.post('/import_orders', json=[make_order('PO-1'), make_order('PO-2'), make_order('PO-3')])
+
+    assert response.json['imported'] == 2
+    assert [(error['row'], error['message']) for error in response.json['errors']] == [
+        (2, "An order with this number already exists")
+    ]
+
+
+def test_unique_migration_refuses_duplicates_until_deduped(tmp_path):
+    init_pool(str(tmp_path / 'orders.sqlite'))
+    try:
+        apply_migrations(target_version=6)
+        with get_db_connection() as conn:
+            for vendor, order_no in (('First', 'PO-1'), ('Second', 'PO-1'), ('Third', 'PO-1'), ('Other', 'PO-2')):
+                conn.execute(
+                    "INSERT INTO orders (order_date, vendor, order_no, item_name, currency, amount, color, "
+                    "last_updated) VALUES ('2024-01-01', ?, ?, 'I', 'USD', '1.00', 'red', '2024-01-01')",
+                    (vendor, order_no)
+                )
+
+        with pytest.raises(sqlite3.IntegrityError, match=r"PO-1 \(3 copies\)"):
+            apply_migrations()
+        with get_read_connection() as conn:
+            assert get_schema_version(conn) == 6
+            assert conn.execute("SELECT COUNT(*) FROM orders WHERE order_no = 'PO-1'").fetchone()[0] == 3
+
+        app = Flask(__name__)
+        register_commands(app)
+        result = app.test_cli_runner().invoke(args=['dedupe-order-numbers'])
+        assert "Renamed 2 orders" in result.output
+
+        assert apply_migrations() >= 7
+        with get_read_connection() as conn:
+            rows = conn.execute("SELECT rowid, vendor, order_no FROM orders ORDER BY rowid").fetchall()
+        assert [(row['vendor'], row['order_no']) for row in rows] == [
+            ('First', 'PO-1'),
+            ('Second', f"PO-1-dup-{rows[1]['rowid']}"),
+            ('Third', f"PO-1-dup-{rows[2]['rowid']}"),
+            ('Other', 'PO-2'),
+        ]
+        with pytest.raises(DuplicateOrderError):
+            OrdersDB.create_order(make_order('PO-1'))
+    finally:
+        close_pool()
+
+
+def rollup_matches_orders():
+    """
+    Compare the totals rollup with the same sums computed from orders
+    """
+    with get_read_connection() as conn:
+        rollup = conn.execute(
+            "SELECT currency, order_status, ROUND(SUM(total), 2), SUM(order_count) "
+            "FROM order_totals_rollup GROUP BY currency, order_status"
+        ).fetchall()
+        expected = conn.execute(
+            "SELECT currency, order_status, ROUND(SUM(CAST(amount AS REAL)), 2), COUNT(*) FROM orders "
+            "WHERE amount IS NOT NULL AND amount != '' AND currency IS NOT NULL AND currency != '' "
+            "GROUP BY currency, order_status"
+        ).fetchall()
+    return sorted(map(tuple, rollup)) == sorted(map(tuple, expected))
+
+
+def test_totals_rollup_follows_every_write(client):
+    for order in (make_order('PO-1', amount='10.50'), make_order('PO-2', amount='4.25', currency='EUR'),
+                  make_order('PO-3', amount='1200', currency='JPY', order_status='completed'),
+                  make_order('PO-4', amount='0.99')):
+        assert client.post('/submit_order', data=order).json['success']
+    assert rollup_matches_orders()
+
+    for order_no, changes in (('PO-1', {'amount': '12.00'}),
+                              ('PO-2', {'currency': 'JPY', 'order_status': 'cancelled'}),
+                              ('PO-4', {'amount': '3.00', 'order_status': 'completed'})):
+        assert client.post(f'/update_order/{order_no}', data=make_order(order_no, **changes)).json['success']
+        assert rollup_matches_orders()
+
+    client.post('/delete_order/PO-3')
+    assert OrdersDB.get_order('PO-3') is None
+    assert rollup_matches_orders()
+
+    assert OrdersDB.bulk_update_orders(['PO-1', 'PO-2', 'PO-4'], {'order_status': 'completed'}) == 3
+    assert rollup_matches_orders()
+
+    OrdersDB.bulk_update_orders(['PO-1'], {'currency': 'EUR'})
+    assert rollup_matches_orders()
+    with get_read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM order_totals_rollup WHERE order_count <= 0").fetchone()[0] == 0
+
+
+def search_numbers(query, **filters):
+    orders, _ = OrdersDB.search(query, **filters)
+    return [order['order_no'] for order in orders]
+
+
+def test_search_ranks_vendor_and_order_number_above_notes(database):
+    OrdersDB.create_order(make_order('PO-1', notes='ordered via acme reseller'))
+    OrdersDB.create_order(make_order('PO-2', vendor='Acme'))
+    OrdersDB.create_order(make_order('ACME-3'))
+    OrdersDB.create_order(make_order('PO-4', item_name='Unrelated'))
+
+    assert search_numbers('acme')[2] == 'PO-1'
+    assert set(search_numbers('acme')[:2]) == {'PO-2', 'ACME-3'}
+    assert search_numbers('ACME-3') == ['ACME-3']
+    assert search_numbers('acm res') == ['PO-1']
+
+
+def test_search_index_follows_updates_and_deletes(client):
+    OrdersDB.create_order(make_order('PO-1', item_name='Walnut desk'))
+    OrdersDB.create_order(make_order('PO-2', item_name='Walnut shelf'))
+
+    client.post('/update_order/PO-1', data=make_order('PO-1', item_name='Oak desk'))
+    client.post('/delete_order/PO-2')
+
+    assert search_numbers('walnut') == []
+    assert search_numbers('oak desk') == ['PO-1']
+    OrdersDB.bulk_update_orders(['PO-1'], {'tracking_no': '1Z999AA10123456784'})
+    assert search_numbers('1Z999') == ['PO-1']
+
+
+@pytest.mark.parametrize('query', ['"', 'AND OR NOT *', '"unbalanced', 'desk"', 'NEAR(', '-', '^desk', 'desk:'])
+def test_search_treats_operators_as_text(client, query):
+    OrdersDB.create_order(make_order('PO-1', item_name='Standing desk'))
+
+    response = client.get('/search', query_string={'q': query}, headers={'X-Requested-With': 'XMLHttpRequest'})
+
+    assert response.status_code == 200 and response.json['success']
+    assert [order['order_no'] for order in response.json['orders']] == (['PO-1'] if 'desk' in query else [])
@@ -0,0 +1,106 @@
+import sqlite3
+
+import pytest
+
+from conftest import make_order
+from models.orders import OrdersDB
+from utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def archive(database):
+    """
+    25 archived orders, several sharing each order date so ties are broken by rowid
+    """
+    orders = [
+        make_order(f"PO-{number:02d}", order_date=f"2024-01-{number // 3 + 1:02d}",
+                   order_status='completed' if number % 2 else 'cancelled')
+        for number in range(25)
+    ]
+    assert OrdersDB.bulk_create_orders(orders) == {}
+    OrdersDB.create_order(make_order('PO-ACTIVE'))
+    return database
+
+
+def archive_page(**kwargs):
+    orders, _, _, pagination, _ = OrdersDB.get_archived_orders(limit=10, **kwargs)
+    return [order['order_no'] for order in orders], pagination
+
+
+def test_cursor_pages_match_offset_pages(archive):
+    offset_pages = [archive_page(page=page)[0] for page in (1, 2, 3)]
+
+    first, pagination = archive_page()
+    second, pagination = archive_page(after=pagination['next_cursor'])
+    third, pagination = archive_page(after=pagination['next_cursor'])
+
+    assert [first, second, third] == offset_pages
+    assert sum(map(len, offset_pages)) == 25
+    assert pagination['next_cursor'] is None
+
+
+def test_before_cursor_returns_previous_page(archive):
+    first, pagination = archive_page()
+    second, pagination = archive_page(after=pagination['next_cursor'])
+
+    previous, pagination = archive_page(before=pagination['prev_cursor'])
+
+    assert previous == first
+    assert pagination['prev_cursor'] is None
+    assert archive_page(after=pagination['next_cursor'])[0] == second
+
+
+def test_malformed_cursor_falls_back_to_first_page(archive):
+    assert decode_cursor('not-a-cursor') is None
+    assert decode_cursor(encode_cursor('2024-01-01', '2024-01-01', 'x')) is None
+
+    assert archive_page(after='not-a-cursor')[0] == archive_page()[0]
+
+
+def test_page_and_facets_share_one_snapshot(archive, monkeypatch):
+    query_facets = OrdersDB._query_archive_facets
+
+    def write_then_query(cursor):
+        # Another process archives an order from a new year between the page and facet reads
+        with sqlite3.connect(archive) as conn:
+            conn.execute("UPDATE orders SET order_date = '2030-05-01', order_status = 'completed' "
+                         "WHERE order_no = 'PO-ACTIVE'")
+        conn.close()
+        return query_facets(cursor)
+
+    monkeypatch.setattr(OrdersDB, '_query_archive_facets', staticmethod(write_then_query))
+    _, years, _, pagination, _ = OrdersDB.get_archived_orders(limit=10)
+
+    assert years == ['2024'] and pagination['total_count'] == 25
+    monkeypatch.undo()
+    assert OrdersDB.get_archived_orders(limit=10)[1] == ['2030', '2024']
+
+
+def test_cursor_pages_carry_no_page_numbers(archive):
+    _, offset_pagination = archive_page(page=2)
+    _, cursor_pagination = archive_page(after=archive_page()[1]['next_cursor'])
+
+    assert (offset_pagination['current_page'], offset_pagination['total_pages']) == (2, 3)
+    assert 'current_page' not in cursor_pagination and 'total_pages' not in cursor_pagination
+    assert cursor_pagination['total_count'] == 25 and cursor_pagination['has_prev']
+
+
+def test_cursor_past_either_end_has_no_neighbour_there(archive):
+    # Cursors whose rows are gone, sorting above and below every archived order
+    newest, pagination = archive_page(after=encode_cursor('2099-01-01', '2099-01-01', 10 ** 9))
+    assert newest == archive_page()[0]
+    assert not pagination['has_prev'] and pagination['prev_cursor'] is None
+    assert pagination['has_next']
+
+    oldest, pagination = archive_page(before=encode_cursor('2000-01-01', '2000-01-01', 0))
+    assert oldest == (archive_page(page=2)[0] + archive_page(page=3)[0])[-10:]
+    assert not pagination['has_next'] and pagination['next_cursor'] is None
+    assert pagination['has_prev']
+
+
+def test_neighbour_probe_respects_filters(archive):
+    completed, pagination = archive_page(status_filter='completed')
+    assert len(completed) == 10
+
+    _, pagination = archive_page(status_filter='completed', after=pagination['next_cursor'])
+    assert pagination['has_prev'] and not pagination['has_next']
@@ -0,0 +1,84 @@
+import pytest
+from flask import request
+
+from conftest import make_order
+from models.orders import OrdersDB
+from utils.response_cache import CachedResponse, ResponseCache, cache_response, get_response_cache
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def entry(version='1', size=400):
+    return CachedResponse(version, 200, [], b'', size)
+
+
+@pytest.fixture
+def hits(database):
+    """
+    Count response cache hits from the start of the test
+    """
+    start = get_response_cache().stats()['hits']
+    return lambda: get_response_cache().stats()['hits'] - start
+
+
+def test_repeat_request_is_served_from_cache(client, hits):
+    OrdersDB.create_order(make_order('PO-1'))
+
+    first = client.get('/active_orders')
+    second = client.get('/active_orders')
+
+    assert second.data == first.data
+    assert hits() == 1 and get_response_cache().stats()['entries'] == 1
+
+
+def test_write_invalidates_cached_responses(client, hits):
+    OrdersDB.create_order(make_order('PO-1'))
+    client.get('/active_orders')
+
+    OrdersDB.create_order(make_order('PO-2'))
+    orders = client.get('/active_orders').json['orders']
+
+    assert sorted(order['order_no'] for order in orders) == ['PO-1', 'PO-2']
+    assert hits() == 0
+
+
+def test_ajax_and_full_pages_are_cached_separately(client, hits):
+    app = client.application
+    renders = []
+
+    @app.route('/page')
+    @cache_response
+    def page():
+        renders.append(1)
+        return {'ajax': True} if request.headers.get('X-Requested-With') else '<html></html>'
+
+    full = client.get('/page')
+    ajax = client.get('/page', headers=AJAX)
+
+    assert full.mimetype == 'text/html' and ajax.json == {'ajax': True}
+    assert client.get('/page').data == full.data
+    assert client.get('/page', headers=AJAX).data == ajax.data
+    assert len(renders) == 2 and hits() == 2
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes():
+    cache = ResponseCache(max_bytes=1000)
+    cache.put('a', entry())
+    cache.put('b', entry())
+    assert cache.get('a', '1') is not None
+
+    cache.put('c', entry())
+    cache.put('huge', entry(size=1001))
+
+    assert cache.get('b', '1') is None
+    assert cache.get('a', '1') is not None and cache.get('c', '1') is not None
+    assert cache.get('huge', '1') is None
+    assert cache.stats()['bytes'] == 800 and cache.stats()['evictions'] == 1
+
+
+def test_stale_entries_are_dropped_on_lookup():
+    cache = ResponseCache(max_bytes=1000)
+    cache.put('a', entry(version='1'))
+
+    assert cache.get('a', '2') is None
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+
+from utils.database import get_read_connection
+from utils.slow_queries import get_slow_query_log
+
+# Slow by construction: counts to a few hundred thousand in a recursive CTE
+COUNT_UP = """
+    WITH RECURSIVE numbers(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM numbers WHERE n < ?)
+    SELECT n FROM numbers
+"""
+
+
+@pytest.fixture
+def slow_log(database, caplog):
+    log = get_slow_query_log()
+    threshold, sample_rate = log.threshold, log.sample_rate
+    log.configure(20, 1.0)
+    log.clear()
+    caplog.set_level(logging.WARNING, logger='parcels.slow_queries')
+    yield lambda: [record.getMessage() for record in caplog.records if record.name == 'parcels.slow_queries']
+    log.threshold, log.sample_rate = threshold, sample_rate
+    log.clear()
+
+
+def test_slow_statement_is_logged_once_with_its_plan(slow_log):
+    with get_read_connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM orders").fetchone()
+        # Each batch is fast on its own; the statement crosses the threshold across fetches
+        cursor = conn.execute(COUNT_UP, (300000,))
+        while cursor.fetchmany(1000):
+            pass
+
+    messages = slow_log()
+    assert len(messages) == 1
+    message = messages[0]
+    assert 'WITH RECURSIVE numbers(n)' in message and 'params (int)' in message
+    assert 'test_slow_queries.py' in message
+    assert '  SCAN numbers' in message
+    assert '300000' not in message
+
+
+def test_plan_is_explained_once_per_statement(slow_log):
+    log = get_slow_query_log()
+    with get_read_connection() as conn:
+        conn.execute(COUNT_UP, (300000,)).fetchall()
+        # Swap the captured plan, so a second EXPLAIN would show up in the log
+        (sql, _), = log._plans.items()
+        log._plans[sql] = ['CACHED PLAN']
+        conn.execute(COUNT_UP, (300001,)).fetchall()
+
+    first, second = slow_log()
+    assert '  SCAN numbers' in first
+    assert second.endswith('  CACHED PLAN')
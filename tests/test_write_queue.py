@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+import models.orders
+import utils.write_queue
+from conftest import make_order
+from models.orders import OrdersDB
+from utils.database import get_read_connection, get_writer
+from utils.metrics import end_request_stats, start_request_stats
+from utils.write_queue import WriteQueue, get_write_queue
+
+
+def insert(order_no):
+    return lambda cursor: cursor.execute(
+        "INSERT INTO orders (order_date, vendor, order_no, item_name, currency, amount, color, last_updated) "
+        "VALUES ('2024-01-01', 'V', ?, 'I', 'USD', '1.00', 'red', '2024-01-01')", (order_no,)
+    )
+
+
+def order_nos():
+    with get_read_connection() as conn:
+        return {row['order_no'] for row in conn.execute("SELECT order_no FROM orders")}
+
+
+@pytest.fixture
+def queue(database):
+    # A generous wait keeps everything submitted by a test in one batch
+    write_queue = WriteQueue(database, max_wait_ms=100)
+    yield write_queue
+    write_queue.close()
+
+
+@pytest.fixture
+def queued_writes(database, monkeypatch):
+    monkeypatch.setattr(models.orders, 'WRITE_QUEUE_ENABLED', True)
+
+
+def test_failing_operation_does_not_affect_its_batch(queue):
+    def fail(cursor):
+        insert('PO-BAD')(cursor)
+        raise ValueError("bad order")
+
+    futures = [queue.submit(insert('PO-1')), queue.submit(fail), queue.submit(insert('PO-2'))]
+
+    assert futures[0].result(5).rowcount == 1
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    assert futures[2].result(5).rowcount == 1
+    assert order_nos() == {'PO-1', 'PO-2'}
+
+
+def test_savepoint_failure_resolves_every_future_and_writer_survives(queue):
+    def end_transaction(cursor):
+        # Ends the batch transaction, so releasing the savepoint afterwards fails
+        cursor.execute("COMMIT")
+
+    futures = [queue.submit(insert('PO-1')), queue.submit(end_transaction), queue.submit(insert('PO-2'))]
+
+    for future in futures:
+        with pytest.raises(sqlite3.Error):
+            future.result(5)
+    assert queue.submit(insert('PO-3')).result(5).rowcount == 1
+    assert 'PO-3' in order_nos()
+
+
+def test_unexpected_error_fails_batch_and_writer_survives(queue, monkeypatch):
+    class BrokenWriter:
+        def acquire(self):
+            raise RuntimeError("writer unavailable")
+
+    monkeypatch.setattr(utils.write_queue, 'get_writer', BrokenWriter)
+    with pytest.raises(RuntimeError):
+        queue.submit(insert('PO-1')).result(5)
+
+    monkeypatch.setattr(utils.write_queue, 'get_writer', get_writer)
+    assert queue.submit(insert('PO-2')).result(5).rowcount == 1
+    assert order_nos() == {'PO-2'}
+
+
+def test_timed_out_write_is_cancelled(queued_writes, monkeypatch):
+    monkeypatch.setattr(models.orders, 'DB_POOL_TIMEOUT', 0.2)
+    writer = get_writer()
+    conn = writer.acquire()
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="was cancelled"):
+            OrdersDB.create_order(make_order('PO-1'))
+    finally:
+        writer.release(conn)
+
+    OrdersDB.create_order(make_order('PO-2'))
+    assert order_nos() == {'PO-2'}
+
+
+def test_queued_writes_count_toward_request_metrics(queued_writes):
+    stats = start_request_stats()
+    try:
+        OrdersDB.create_order(make_order('PO-1'))
+    finally:
+        end_request_stats()
+
+    assert stats.statements >= 1
+    assert get_write_queue().stats()['operations'] == 1
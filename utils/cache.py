@@ -0,0 +1,48 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class VersionedCache:
+    """
+    Thread-safe cache whose entries are only valid for the data version they
+    were computed under
+
+    Shared by every request thread in the process. Cached values are handed out
+    as-is, so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, version: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key at version, computing it on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return a snapshot of cache usage
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """
+        Drop all cached entries
+        """
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,37 @@
+import click
+from flask import Flask
+
+from utils.migrations import (
+    apply_migrations,
+    dedupe_order_numbers,
+    rebuild_search_index,
+    rebuild_totals_rollup
+)
+
+
+def register_commands(app: Flask):
+    """Register maintenance CLI commands with the app."""
+
+    @app.cli.command("migrate")
+    def migrate_command():
+        """Apply pending schema migrations."""
+        click.echo(f"Database schema at version {apply_migrations()}")
+
+    @app.cli.command("rebuild-totals")
+    def rebuild_totals_command():
+        """Recompute the currency totals rollup from the orders table."""
+        click.echo(f"Rebuilt totals rollup ({rebuild_totals_rollup()} rows)")
+
+    @app.cli.command("rebuild-search")
+    def rebuild_search_command():
+        """Rebuild the full-text search index from the orders table."""
+        rebuild_search_index()
+        click.echo("Rebuilt search index")
+
+    @app.cli.command("dedupe-order-numbers")
+    def dedupe_order_numbers_command():
+        """Rename later copies of duplicated order numbers to <order_no>-dup-<rowid>."""
+        renamed = dedupe_order_numbers()
+        for old, new in renamed:
+            click.echo(f"{old} -> {new}")
+        click.echo(f"Renamed {len(renamed)} orders")
@@ -0,0 +1,94 @@
+import functools
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from flask import Response, make_response, request, session
+
+from utils.data_version import get_change_stamp
+from utils.response_cache import request_cache_key, vary_on_request_key
+
+_lock = threading.Lock()
+# (change counter, Last-Modified timestamp) of the latest full response
+_last_modified: Tuple[Optional[int], Optional[float]] = (None, None)
+
+
+def _etag(counter: int, changed_at: float, kwargs) -> str:
+    key = (counter, changed_at, request_cache_key(), tuple(sorted(kwargs.items())))
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+def _last_updated_timestamp(last_updated: Optional[str], now: float) -> float:
+    try:
+        timestamp = datetime.strptime(last_updated[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+    # A future-dated order must not push Last-Modified past the next real change
+    return min(timestamp, now)
+
+
+def _not_modified(etag: str, last_modified: Optional[float]) -> Response:
+    response = vary_on_request_key(Response(status=304))
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def conditional_get(last_updated: Callable[[], Optional[str]]) -> Callable:
+    """
+    Answer conditional GETs with 304 Not Modified while the data is unchanged
+
+    The strong ETag hashes the database's change counter and change time with
+    the endpoint, query arguments and AJAX flag, so every worker process hands
+    out the same validators, across restarts too. Last-Modified is the later
+    of last_updated() and the recorded change time, and is only sent once
+    that second has passed, so two changes within one second can never share
+    it. Validators are checked before the view runs, so a 304 costs no query.
+    Responses are marked no-cache so browsers always revalidate, and requests
+    with pending flash messages are always answered in full.
+    """
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            global _last_modified
+            if '_flashes' in session:
+                # The fresh page would show the pending messages
+                return vary_on_request_key(make_response(view(*args, **kwargs)))
+
+            counter, changed_at = get_change_stamp()
+            etag = _etag(counter, changed_at, kwargs)
+            with _lock:
+                known_counter, known_last_modified = _last_modified
+            last_modified = known_last_modified if known_counter == counter else None
+
+            if request.if_none_match:
+                # If-None-Match takes precedence; If-Modified-Since is ignored when it is sent
+                if request.if_none_match.contains(etag):
+                    return _not_modified(etag, last_modified)
+            elif request.if_modified_since and last_modified is not None \
+                    and last_modified <= request.if_modified_since.timestamp():
+                return _not_modified(etag, last_modified)
+
+            response = vary_on_request_key(make_response(view(*args, **kwargs)))
+            if response.status_code != 200:
+                return response
+
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            if last_modified is None:
+                now = time.time()
+                last_modified = math.ceil(max(changed_at, _last_updated_timestamp(last_updated(), now)))
+                with _lock:
+                    _last_modified = (counter, last_modified)
+            if last_modified <= time.time():
+                response.last_modified = last_modified
+            return response
+
+        return wrapper
+
+    return decorator
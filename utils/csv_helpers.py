@@ -1,13 +1,22 @@
 import csv
 import io
-from typing import List
+import json
+import zlib
+from typing import Iterable, Iterator, List, Optional
 
-from flask import make_response
+from flask import Response, stream_with_context
 
+from config import EXPORT_CHUNK_SIZE, EXPORT_GZIP_LEVEL
 
-def create_csv_response(data: List, headers: List[str], filename: str):
+# Export formats and compressions accepted by create_export_response
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_COMPRESSIONS = {'gzip': ('gz', 'application/gzip')}
+
+
+def iter_csv_chunks(data: Iterable, headers: List[str],
+                    chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
     """
-    Create a CSV response from data
+    Encode rows as CSV, yielding roughly chunk_size characters at a time
     """
     output = io.StringIO()
     writer = csv.writer(output)
@@ -15,20 +24,89 @@ def create_csv_response(data: List, headers: List[str], filename: str):
     # Write headers
     writer.writerow(headers)
 
-    # Write data
+    # Write data, flushing the buffer whenever it fills up
     for row in data:
         writer.writerow(row)
+        if output.tell() >= chunk_size:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    if output.tell():
+        yield output.getvalue()
+
+
+def iter_ndjson_chunks(data: Iterable, headers: List[str],
+                       chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Encode rows as newline-delimited JSON objects keyed by headers, yielding
+    roughly chunk_size characters at a time
+    """
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    lines = []
+    size = 0
+
+    for row in data:
+        line = encode(dict(zip(headers, row)))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= chunk_size:
+            lines.append('')
+            yield '\n'.join(lines)
+            lines = []
+            size = 0
+
+    if lines:
+        lines.append('')
+        yield '\n'.join(lines)
+
 
-    response = make_response(output.getvalue())
+def iter_gzip_chunks(chunks: Iterable[str], level: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Compress text chunks into one gzip stream as they arrive, at level or
+    EXPORT_GZIP_LEVEL
+
+    zlib keeps only its window between chunks, so memory stays bounded however
+    long the stream is. Chunks that compress to nothing yet are not yielded.
+    """
+    # wbits=31 selects the gzip container (header and CRC) rather than raw zlib
+    compressor = zlib.compressobj(EXPORT_GZIP_LEVEL if level is None else level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def create_export_response(data: Iterable, headers: List[str], filename: str,
+                           export_format: str = 'csv', compression: Optional[str] = None):
+    """
+    Create a streamed export response from data in export_format, optionally
+    compressed
+
+    Rows are pulled from data lazily as the response is sent, so memory use
+    stays bounded by the chunk size rather than by the number of rows.
+    """
+    if export_format == 'ndjson':
+        chunks = iter_ndjson_chunks(data, headers)
+    else:
+        chunks = iter_csv_chunks(data, headers)
+
+    mimetype = EXPORT_FORMATS[export_format]
+    if compression == 'gzip':
+        chunks = iter_gzip_chunks(chunks)
+        mimetype = EXPORT_COMPRESSIONS[compression][1]
+
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
     response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-    response.headers["Content-type"] = "text/csv"
 
     return response
 
 
-def build_export_filename(base_name: str, **filters) -> str:
+def build_export_filename(base_name: str, export_format: str = 'csv',
+                          compression: Optional[str] = None, **filters) -> str:
     """
-    Build export filename with applied filters
+    Build export filename with applied filters, e.g. archived_orders_completed.ndjson.gz
     """
     filename = base_name
 
@@ -36,4 +114,8 @@ def build_export_filename(base_name: str, **filters) -> str:
         if value:
             filename += f"_{value}"
 
-    return f"{filename}.csv"
+    filename += f".{export_format}"
+    if compression:
+        filename += f".{EXPORT_COMPRESSIONS[compression][0]}"
+
+    return filename
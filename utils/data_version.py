@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+from config import logger
+from utils.database import configure_connection, get_pool, get_read_connection, read_only_uri
+
+
+class DataVersion:
+    """
+    Process-wide stamp that changes whenever the orders data may have changed
+
+    Combines a counter bumped by this process's own writes with SQLite's
+    PRAGMA data_version, read on a dedicated connection that never writes, so
+    commits made by other connections or worker processes are noticed too.
+    Checking the stamp touches no table and costs a single pragma. Stamps are
+    only comparable within one process; see get_change_stamp() for a value
+    shared by all of them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = 0
+        self._external = 0
+        self._watcher: Optional[sqlite3.Connection] = None
+        self._watched_path: Optional[str] = None
+        self._pid = os.getpid()
+
+    def _poll_external(self) -> int:
+        if self._pid != os.getpid():
+            self._watcher = None
+            self._pid = os.getpid()
+
+        database_path = get_pool().database_path
+        if self._watcher is not None and self._watched_path != database_path:
+            # The pool was re-pointed (init_pool); nothing cached for the old file applies
+            self._watcher.close()
+            self._watcher = None
+            self._local += 1
+
+        try:
+            if self._watcher is None:
+                self._watcher = configure_connection(
+                    sqlite3.connect(read_only_uri(database_path), uri=True, check_same_thread=False),
+                    read_only=True
+                )
+                self._watched_path = database_path
+            self._external = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            # Without a watcher we cannot prove nothing changed; force a new stamp
+            logger.error(f"Error reading data version: {str(e)}")
+            self._watcher = None
+            self._local += 1
+        return self._external
+
+    def bump(self):
+        """
+        Record a write made by this process
+        """
+        with self._lock:
+            self._local += 1
+
+    def local(self) -> int:
+        """
+        Return the counter of this process's own writes, without polling SQLite
+        """
+        return self._local
+
+    def current(self) -> str:
+        """
+        Return the current data version stamp
+        """
+        with self._lock:
+            external = self._poll_external()
+            return f"{external}.{self._local}"
+
+
+_data_version = DataVersion()
+# (data version, change counter, change time) as last read from data_changes
+_change_stamp: Tuple[Optional[str], int, float] = (None, 0, 0.0)
+
+
+def get_data_version() -> str:
+    """
+    Return the process-wide data version stamp
+    """
+    return _data_version.current()
+
+
+def get_local_data_version() -> int:
+    """
+    Return the count of this process's own writes; unlike get_data_version(),
+    this runs no query and misses commits made by other connections
+    """
+    return _data_version.local()
+
+
+def get_change_stamp() -> Tuple[int, float]:
+    """
+    Return the database's order change counter and the Unix time of the last change
+
+    Both live in the trigger-maintained data_changes row, so every process
+    sees the same values, across restarts too. The row is only re-read when
+    this process's data version has moved, so unchanged data costs the usual
+    single pragma.
+    """
+    global _change_stamp
+    version = get_data_version()
+    cached_version, counter, changed_at = _change_stamp
+    if cached_version == version:
+        return counter, changed_at
+
+    with get_read_connection() as conn:
+        try:
+            row = conn.execute("SELECT counter, changed_at FROM data_changes WHERE id = 1").fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading change counter: {str(e)}")
+            raise
+    _change_stamp = (version, row['counter'], row['changed_at'])
+    return row['counter'], row['changed_at']
+
+
+def bump_data_version():
+    """
+    Invalidate everything cached against the current data version
+    """
+    _data_version.bump()
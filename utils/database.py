@@ -1,22 +1,428 @@
+import atexit
+import os
 import sqlite3
-from config import DATABASE_PATH, logger
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, LifoQueue
+from typing import Iterator, Optional
 
-def get_db_connection():
-    """Create a database connection with row factory."""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
+from config import (
+    DATABASE_PATH,
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+    logger
+)
+from utils.metrics import record_sql
+from utils.shipping import install_carrier_lookup
+from utils.slow_queries import get_slow_query_log, record_statement
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports statements, time spent in SQLite and rows fetched to
+    the request being measured (see utils.metrics), and hands statements that
+    cross the slow-query threshold to utils.slow_queries
+
+    A statement's time is the execute call plus every fetch from its result,
+    so a query that is cheap to start but slow to drain is still caught.
+    """
+    _sql = None
+    _parameters = ()
+    _elapsed = 0.0
+    _many = False
+    _traced = True
+
+    def _start(self, sql, parameters, many: bool = False):
+        self._sql = sql
+        self._parameters = parameters
+        self._elapsed = 0.0
+        self._many = many
+        self._traced = False
+
+    def _track(self, seconds: float, statements: int = 0, rows: int = 0):
+        record_sql(seconds, statements, rows)
+        if self._traced:
+            return
+        self._elapsed += seconds
+        if self._elapsed >= get_slow_query_log().threshold:
+            self._traced = True
+            record_statement(self.connection, self._sql, self._parameters, self._elapsed, self._many)
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._track(time.perf_counter() - start, statements=1)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql, (), many=True)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._track(time.perf_counter() - start, statements=1)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            record_sql(time.perf_counter() - start, statements=1)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._track(time.perf_counter() - start, rows=int(row is not None))
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._track(time.perf_counter() - start, rows=len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._track(time.perf_counter() - start, rows=len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._track(time.perf_counter() - start)
+            raise
+        self._track(time.perf_counter() - start, rows=1)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors, including the ones behind conn.execute(), are
+    InstrumentedCursors
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def configure_connection(conn: sqlite3.Connection, cache_size_kb: int = DB_CACHE_SIZE_KB,
+                         mmap_size: int = DB_MMAP_SIZE,
+                         busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS,
+                         synchronous: str = 'NORMAL', read_only: bool = False) -> sqlite3.Connection:
+    """
+    Apply the standard pragmas to a freshly opened connection
+
+    WAL lets readers and the writer proceed concurrently, and synchronous=NORMAL
+    is safe under WAL while avoiding an fsync on every commit. Pass
+    synchronous='FULL' where a commit must be durable before it is acknowledged.
+    WAL is persistent, so read-only connections rely on a writer having set it.
+    """
+    if synchronous.upper() not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+        raise ValueError(f"Unknown synchronous mode: {synchronous}")
+
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    if not read_only:
+        conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {synchronous.upper()}")
+    # Negative cache_size is interpreted by SQLite as KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = {-abs(int(cache_size_kb))}")
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    install_carrier_lookup(conn)
+    return conn
+
+
+def read_only_uri(database_path: str) -> str:
+    """
+    Return a URI that opens database_path read-only (connect with uri=True)
+    """
+    return f"{Path(database_path).absolute().as_uri()}?mode=ro"
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pre-configured SQLite connections
+
+    Connections are handed out LIFO so the warmest page cache is reused first,
+    validated before use, and closed on shutdown. The pool is per-process: a
+    forked worker discovers the pid change and starts with an empty pool instead
+    of sharing file handles with its parent.
+
+    A read_only pool opens its connections with mode=ro, so SQLite rejects any
+    write made through them. Otherwise connections start their transactions
+    with BEGIN IMMEDIATE, taking the write lock up front rather than failing
+    to upgrade a read lock part-way through.
+    """
+
+    def __init__(self, database_path: str = DATABASE_PATH, max_size: int = DB_POOL_SIZE,
+                 timeout: float = DB_POOL_TIMEOUT,
+                 cached_statements: int = DB_STATEMENT_CACHE_SIZE,
+                 read_only: bool = False, **pragmas):
+        self.database_path = database_path
+        self.max_size = max(1, int(max_size))
+        self.timeout = timeout
+        self.cached_statements = int(cached_statements)
+        self.read_only = read_only
+        self.pragmas = pragmas
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._open_count = 0
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            conn = sqlite3.connect(read_only_uri(self.database_path), uri=True, check_same_thread=False,
+                                   cached_statements=self.cached_statements,
+                                   factory=InstrumentedConnection)
+        else:
+            conn = sqlite3.connect(self.database_path, check_same_thread=False,
+                                   cached_statements=self.cached_statements,
+                                   factory=InstrumentedConnection)
+        try:
+            configure_connection(conn, read_only=self.read_only, **self.pragmas)
+            if not self.read_only:
+                conn.isolation_level = 'IMMEDIATE'
+        except sqlite3.Error:
+            conn.close()
+            raise
+        with self._lock:
+            self._open_count += 1
         return conn
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._open_count -= 1
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error closing pooled connection: {str(e)}")
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            # Base-class execute keeps the check out of request SQL metrics
+            sqlite3.Connection.execute(conn, "SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Check out a connection, opening a new one if none are idle
+        """
+        if self._pid != os.getpid():
+            self._reset()
+        if self._closed:
+            raise sqlite3.OperationalError("Connection pool has been closed")
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(
+                f"Timed out waiting for a database connection (pool size {self.max_size})"
+            )
+
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except Empty:
+                    return self._connect()
+                if self._is_healthy(conn):
+                    return conn
+                logger.error("Discarding unhealthy pooled connection")
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        """
+        Return a connection to the pool, rolling back any open transaction
+        """
+        if self._pid != os.getpid():
+            # Connection was inherited across a fork; never reuse it here
+            return
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+        else:
+            if self._closed:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """
+        Close all idle connections and refuse further checkouts
+        """
+        if self._pid != os.getpid():
+            return
+
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of pool usage
+        """
+        return {
+            'max_size': self.max_size,
+            'open': self._open_count,
+            'idle': self._idle.qsize()
+        }
+
+
+_pool: Optional[ConnectionPool] = None
+_writer: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _open_pools(database_path: str, settings: dict):
+    global _pool, _writer
+    if _pool is not None:
+        _pool.close()
+    if _writer is not None:
+        _writer.close()
+    _writer = ConnectionPool(database_path, **dict(settings, max_size=1))
+    _pool = ConnectionPool(database_path, read_only=True, **settings)
+
+
+def init_pool(database_path: str = DATABASE_PATH, **settings) -> ConnectionPool:
+    """
+    (Re)create the process-wide reader pool and writer, closing any previous ones
+
+    Returns the reader pool; max_size applies to readers only.
+    """
+    with _pool_lock:
+        _open_pools(database_path, settings)
+        return _pool
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the process-wide read-only connection pool, creating it on first use
+    """
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _open_pools(DATABASE_PATH, {})
+    return _pool
+
+
+def get_writer() -> ConnectionPool:
+    """
+    Return the process-wide single-connection writer, creating it on first use
+    """
+    if _writer is None:
+        with _pool_lock:
+            if _writer is None:
+                _open_pools(DATABASE_PATH, {})
+    return _writer
+
+
+def close_pool():
+    """
+    Close the process-wide reader pool and writer
+    """
+    global _pool, _writer
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+atexit.register(close_pool)
+
+
+@contextmanager
+def get_db_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Check out the writer connection for the duration of a with-block
+
+    There is one writer per process, so writers queue here rather than on
+    SQLite's busy handler, and readers never wait for it under WAL. Mirrors
+    sqlite3's own context manager: a pending transaction is committed on
+    success and rolled back on error, then the connection is released.
+    """
+    with _checkout(get_writer()) as conn:
+        yield conn
+
+
+@contextmanager
+def get_read_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Check out a read-only pooled connection for the duration of a with-block
+    """
+    with _checkout(get_pool()) as conn:
+        yield conn
+
+
+@contextmanager
+def _checkout(pool: ConnectionPool) -> Iterator[sqlite3.Connection]:
+    try:
+        conn = pool.acquire()
     except sqlite3.Error as e:
         logger.error(f"Database connection error: {str(e)}")
         raise
 
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
+
+
 def verify_db_connection():
     """Verify database connection is working."""
     try:
         with get_db_connection() as conn:
             conn.execute("SELECT 1")
+        with get_read_connection() as conn:
+            conn.execute("SELECT 1")
         return True
     except sqlite3.Error as e:
         logger.error(f"Database verification error: {str(e)}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,78 @@
+import csv
+import io
+from typing import Dict, List, Tuple
+
+from utils.request_helpers import validate_required_fields
+
+
+def parse_import_records(request, fields: List[str]) -> List[Dict]:
+    """
+    Read order records from an uploaded CSV file or a JSON body
+
+    Accepts a multipart upload in the `file` field, a JSON list of objects, or
+    a JSON object with an `orders` list. Every record is normalized to exactly
+    the given fields, with values stripped and missing ones left blank.
+
+    Raises:
+        ValueError: If the payload is missing or malformed
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        try:
+            text = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+            raw_records = list(csv.DictReader(text))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f"Could not read CSV file: {str(e)}")
+    else:
+        payload = request.get_json(silent=True)
+        raw_records = payload.get('orders') if isinstance(payload, dict) else payload
+        if not isinstance(raw_records, list):
+            raise ValueError("Expected a CSV file upload or a JSON list of orders")
+
+    records = []
+    for raw in raw_records:
+        if not isinstance(raw, dict):
+            raise ValueError("Each order must be an object")
+        records.append({
+            field: '' if raw.get(field) is None else str(raw.get(field)).strip()
+            for field in fields
+        })
+
+    return records
+
+
+def validate_import_records(records: List[Dict],
+                            required_fields: List[str]) -> Tuple[List[int], List[Dict]]:
+    """
+    Validate import records and detect order numbers repeated within the upload
+
+    Returns:
+        Tuple of (indexes of valid records, per-row error entries). Rows are
+        numbered from 1 in the order they were uploaded.
+    """
+    valid = []
+    errors = []
+    seen = set()
+
+    for index, record in enumerate(records):
+        missing_fields = validate_required_fields(record, required_fields)
+        if missing_fields:
+            errors.append(import_error(index, record, f"Missing required fields: {', '.join(missing_fields)}"))
+        elif record['order_no'] in seen:
+            errors.append(import_error(index, record, "Duplicate order number in upload"))
+        else:
+            seen.add(record['order_no'])
+            valid.append(index)
+
+    return valid, errors
+
+
+def import_error(index: int, record: Dict, message: str) -> Dict:
+    """
+    Build one entry of the per-row import error report
+    """
+    return {
+        'row': index + 1,
+        'order_no': record.get('order_no', ''),
+        'message': message
+    }
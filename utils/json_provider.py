@@ -0,0 +1,17 @@
+from collections.abc import Mapping
+
+from flask.json.provider import DefaultJSONProvider
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that also serializes read-only mappings such as OrderRecord
+    """
+
+    @staticmethod
+    def default(o):
+        if hasattr(o, 'to_dict'):
+            return o.to_dict()
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
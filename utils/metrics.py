@@ -0,0 +1,262 @@
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus' default latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 25, 50, 100, 250)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with labels
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels, in the Prometheus exposition layout
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, labels: Tuple = ()):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._values.items())
+
+        for labels, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'parcels_http_request_duration_seconds', 'Request latency by endpoint.',
+    ('endpoint', 'method')
+)
+REQUESTS = Counter(
+    'parcels_http_requests_total', 'Requests handled by endpoint and status code.',
+    ('endpoint', 'method', 'status')
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    'parcels_http_request_sql_statements', 'SQL statements executed per request.',
+    ('endpoint',), STATEMENT_BUCKETS
+)
+REQUEST_SQL_SECONDS = Histogram(
+    'parcels_http_request_sql_seconds', 'Time spent in SQLite per request.',
+    ('endpoint',)
+)
+REQUEST_ROWS = Histogram(
+    'parcels_http_request_rows_fetched', 'Rows fetched from SQLite per request.',
+    ('endpoint',), ROW_BUCKETS
+)
+RESPONSE_BYTES = Histogram(
+    'parcels_http_response_bytes', 'Response body size by endpoint.',
+    ('endpoint',), BYTE_BUCKETS
+)
+DB_METHOD_DURATION = Histogram(
+    'parcels_db_method_duration_seconds', 'OrdersDB call latency by method.',
+    ('method',)
+)
+DB_METHOD_ERRORS = Counter(
+    'parcels_db_method_errors_total', 'OrdersDB calls that raised, by method.',
+    ('method',)
+)
+
+METRICS = (
+    REQUEST_DURATION, REQUESTS, REQUEST_SQL_STATEMENTS, REQUEST_SQL_SECONDS,
+    REQUEST_ROWS, RESPONSE_BYTES, DB_METHOD_DURATION, DB_METHOD_ERRORS
+)
+
+
+class RequestStats:
+    """
+    SQL work attributed to the request currently being handled
+    """
+    __slots__ = ('statements', 'sql_seconds', 'rows', 'parent')
+
+    def __init__(self, parent: Optional['RequestStats'] = None):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.parent = parent
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+def start_request_stats() -> RequestStats:
+    """
+    Begin attributing SQL work on this thread to a new request
+
+    Measurements nest: work recorded here also counts toward any measurement
+    already in progress once this one ends.
+    """
+    stats = RequestStats(_request_stats.get())
+    _request_stats.set(stats)
+    return stats
+
+
+def end_request_stats():
+    """
+    Stop attributing SQL work on this thread to the innermost measurement
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    parent = stats.parent
+    if parent is not None:
+        parent.statements += stats.statements
+        parent.sql_seconds += stats.sql_seconds
+        parent.rows += stats.rows
+    _request_stats.set(parent)
+
+
+def record_sql(seconds: float, statements: int = 0, rows: int = 0):
+    """
+    Add SQL work to the current request, if one is being measured
+    """
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += statements
+        stats.sql_seconds += seconds
+        stats.rows += rows
+
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float,
+                    stats: RequestStats, response_bytes: Optional[int]):
+    """
+    Record one finished request
+    """
+    REQUEST_DURATION.observe(seconds, (endpoint, method))
+    REQUESTS.inc((endpoint, method, str(status)))
+    REQUEST_SQL_STATEMENTS.observe(stats.statements, (endpoint,))
+    REQUEST_SQL_SECONDS.observe(stats.sql_seconds, (endpoint,))
+    REQUEST_ROWS.observe(stats.rows, (endpoint,))
+    if response_bytes is not None:
+        RESPONSE_BYTES.observe(response_bytes, (endpoint,))
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    if inspect.isgeneratorfunction(func):
+        # Time generators across their whole consumption, not just creation
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                yield from func(*args, **kwargs)
+            except Exception:
+                DB_METHOD_ERRORS.inc((name,))
+                raise
+            finally:
+                DB_METHOD_DURATION.observe(time.perf_counter() - start, (name,))
+
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            DB_METHOD_ERRORS.inc((name,))
+            raise
+        finally:
+            DB_METHOD_DURATION.observe(time.perf_counter() - start, (name,))
+
+    return wrapper
+
+
+def instrument_methods(cls):
+    """
+    Class decorator timing every public static method, labelled Class.method
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not isinstance(value, staticmethod):
+            continue
+        setattr(cls, attr, staticmethod(_timed(f"{cls.__name__}.{attr}", value.__func__)))
+    return cls
+
+
+def render_metrics(samples: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+    """
+    Render all metrics, plus values sampled at scrape time, in Prometheus text format
+
+    Args:
+        samples: (name, type, help text, value) for gauges and externally kept counters
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for name, kind, documentation, value in samples:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}",
+                      f"{name} {_format_value(value)}"])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,382 @@
+import sqlite3
+from typing import Callable, List, Optional, Tuple, Union
+
+from config import logger
+from utils.database import get_db_connection
+from utils.slow_queries import get_slow_query_log
+
+# Orders that contribute to currency totals, and how one maps onto a rollup key
+_ROLLUP_QUALIFIES = "{row}.amount IS NOT NULL AND {row}.amount != '' " \
+                    "AND {row}.currency IS NOT NULL AND {row}.currency != ''"
+_ROLLUP_KEY = "COALESCE(strftime('%Y', {row}.order_date), ''), " \
+              "COALESCE(strftime('%m', {row}.order_date), ''), " \
+              "COALESCE({row}.order_status, ''), {row}.currency"
+_ROLLUP_MATCH = "year = COALESCE(strftime('%Y', {row}.order_date), '') " \
+                "AND month = COALESCE(strftime('%m', {row}.order_date), '') " \
+                "AND order_status = COALESCE({row}.order_status, '') " \
+                "AND currency = {row}.currency"
+
+
+def _rollup_add_statement(row: str) -> str:
+    return f"""
+        INSERT INTO order_totals_rollup (year, month, order_status, currency, total, order_count)
+        VALUES ({_ROLLUP_KEY.format(row=row)}, CAST({row}.amount AS REAL), 1)
+        ON CONFLICT (year, month, order_status, currency)
+            DO UPDATE SET total       = total + excluded.total,
+                          order_count = order_count + 1;
+    """
+
+
+def _rollup_subtract_statement(row: str) -> str:
+    return f"""
+        UPDATE order_totals_rollup
+        SET total       = total - CAST({row}.amount AS REAL),
+            order_count = order_count - 1
+        WHERE {_ROLLUP_MATCH.format(row=row)};
+        DELETE FROM order_totals_rollup
+        WHERE {_ROLLUP_MATCH.format(row=row)}
+          AND order_count <= 0;
+    """
+
+
+ROLLUP_POPULATE_SQL = f"""
+    INSERT INTO order_totals_rollup (year, month, order_status, currency, total, order_count)
+    SELECT {_ROLLUP_KEY.format(row='orders')}, SUM(CAST(amount AS REAL)), COUNT(*)
+    FROM orders
+    WHERE {_ROLLUP_QUALIFIES.format(row='orders')}
+    GROUP BY 1, 2, 3, 4
+"""
+
+# Keep the external-content FTS index in step with orders
+_FTS_COLUMNS = "order_no, vendor, item_name, notes, tracking_no"
+_FTS_VALUES = "{row}.order_no, {row}.vendor, {row}.item_name, {row}.notes, {row}.tracking_no"
+_FTS_INSERT = f"INSERT INTO orders_fts (rowid, {_FTS_COLUMNS}) VALUES ({{row}}.rowid, {_FTS_VALUES});"
+_FTS_DELETE = f"INSERT INTO orders_fts (orders_fts, rowid, {_FTS_COLUMNS}) " \
+              f"VALUES ('delete', {{row}}.rowid, {_FTS_VALUES});"
+
+FTS_REBUILD_SQL = "INSERT INTO orders_fts (orders_fts) VALUES ('rebuild')"
+
+# Every change to orders advances one shared counter, so HTTP validators agree
+# across worker processes and restarts
+_UNIX_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+_COUNT_CHANGE = f"UPDATE data_changes SET counter = counter + 1, changed_at = {_UNIX_NOW} WHERE id = 1;"
+
+DUPLICATE_ORDER_NOS_SQL = """
+    SELECT order_no, COUNT(*) AS copies
+    FROM orders
+    GROUP BY order_no
+    HAVING COUNT(*) > 1
+    ORDER BY order_no
+"""
+
+# Duplicates listed in the error raised by migration 7
+_DUPLICATES_LISTED = 50
+
+
+def _require_unique_order_nos(conn: sqlite3.Connection):
+    """
+    Refuse to make order numbers unique while duplicates exist, naming them
+
+    Renaming real order numbers is left to an operator (flask dedupe-order-numbers).
+    """
+    duplicates = conn.execute(DUPLICATE_ORDER_NOS_SQL).fetchall()
+    if not duplicates:
+        return
+
+    listed = ', '.join(f"{row['order_no']} ({row['copies']} copies)" for row in duplicates[:_DUPLICATES_LISTED])
+    if len(duplicates) > _DUPLICATES_LISTED:
+        listed += f" and {len(duplicates) - _DUPLICATES_LISTED} more"
+    raise sqlite3.IntegrityError(
+        f"Cannot make order numbers unique, {len(duplicates)} are duplicated: {listed}. "
+        f"Resolve them, or run `flask dedupe-order-numbers` to rename later copies, then migrate again"
+    )
+
+
+# Each migration is (version, description, statements). A statement is SQL, or
+# a callable taking the connection for checks SQL cannot express. Versions are
+# applied in order and recorded in PRAGMA user_version; never edit a released
+# migration, append a new one instead.
+MIGRATIONS: List[Tuple[int, str, List[Union[str, Callable[[sqlite3.Connection], None]]]]] = [
+    (1, "Create orders table", [
+        """
+        CREATE TABLE IF NOT EXISTS orders
+        (
+            order_date   TEXT NOT NULL,
+            vendor       TEXT NOT NULL,
+            order_no     TEXT NOT NULL,
+            item_name    TEXT NOT NULL,
+            quantity     INTEGER,
+            currency     TEXT NOT NULL,
+            amount       TEXT NOT NULL,
+            color        TEXT NOT NULL,
+            shipped_date TEXT,
+            shipper      TEXT,
+            tracking_no  TEXT,
+            location     TEXT,
+            delivery     TEXT,
+            last_updated TEXT NOT NULL,
+            notes        TEXT,
+            order_status TEXT NOT NULL DEFAULT 'active'
+        )
+        """,
+    ]),
+    (2, "Index archive listing, filters and order number lookups", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_status_date
+            ON orders (order_status, order_date, last_updated)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_order_no
+            ON orders (order_no)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_archived_date
+            ON orders (order_date, last_updated)
+            WHERE order_status IN ('completed', 'cancelled')
+        """,
+    ]),
+    (3, "Add trigger-maintained currency totals rollup", [
+        """
+        CREATE TABLE IF NOT EXISTS order_totals_rollup
+        (
+            year         TEXT    NOT NULL,
+            month        TEXT    NOT NULL,
+            order_status TEXT    NOT NULL,
+            currency     TEXT    NOT NULL,
+            total        REAL    NOT NULL DEFAULT 0,
+            order_count  INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (year, month, order_status, currency)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_insert
+            AFTER INSERT ON orders
+            WHEN {_ROLLUP_QUALIFIES.format(row='NEW')}
+        BEGIN
+            {_rollup_add_statement('NEW')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_delete
+            AFTER DELETE ON orders
+            WHEN {_ROLLUP_QUALIFIES.format(row='OLD')}
+        BEGIN
+            {_rollup_subtract_statement('OLD')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_update_old
+            AFTER UPDATE OF order_date, order_status, currency, amount ON orders
+            WHEN {_ROLLUP_QUALIFIES.format(row='OLD')}
+        BEGIN
+            {_rollup_subtract_statement('OLD')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_update_new
+            AFTER UPDATE OF order_date, order_status, currency, amount ON orders
+            WHEN {_ROLLUP_QUALIFIES.format(row='NEW')}
+        BEGIN
+            {_rollup_add_statement('NEW')}
+        END
+        """,
+        "DELETE FROM order_totals_rollup",
+        ROLLUP_POPULATE_SQL,
+    ]),
+    (4, "Index the active orders listing", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_active_date
+            ON orders (order_date, last_updated)
+            WHERE order_status NOT IN ('completed', 'cancelled')
+        """,
+    ]),
+    (5, "Add FTS5 full-text search over orders", [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+            order_no, vendor, item_name, notes, tracking_no,
+            content = 'orders',
+            content_rowid = 'rowid',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_fts_insert
+            AFTER INSERT ON orders
+        BEGIN
+            {_FTS_INSERT.format(row='NEW')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_fts_delete
+            AFTER DELETE ON orders
+        BEGIN
+            {_FTS_DELETE.format(row='OLD')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_fts_update
+            AFTER UPDATE OF order_no, vendor, item_name, notes, tracking_no ON orders
+        BEGIN
+            {_FTS_DELETE.format(row='OLD')}
+            {_FTS_INSERT.format(row='NEW')}
+        END
+        """,
+        FTS_REBUILD_SQL,
+    ]),
+    (6, "Index last_updated for Last-Modified", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_last_updated ON orders (last_updated)",
+    ]),
+    (7, "Make order numbers unique", [
+        _require_unique_order_nos,
+        "DROP INDEX IF EXISTS idx_orders_order_no",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_order_no ON orders (order_no)",
+    ]),
+    (8, "Index every order by date for the JSON API listing", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_date
+            ON orders (order_date, last_updated)
+        """,
+    ]),
+    (9, "Count order changes for HTTP validators shared by every process", [
+        """
+        CREATE TABLE IF NOT EXISTS data_changes
+        (
+            id         INTEGER PRIMARY KEY CHECK (id = 1),
+            counter    INTEGER NOT NULL DEFAULT 0,
+            changed_at REAL    NOT NULL
+        )
+        """,
+        f"INSERT OR IGNORE INTO data_changes (id, counter, changed_at) VALUES (1, 0, {_UNIX_NOW})",
+        *[
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_orders_changes_{event.lower()}
+                AFTER {event} ON orders
+            BEGIN
+                {_COUNT_CHANGE}
+            END
+            """
+            for event in ('INSERT', 'UPDATE', 'DELETE')
+        ],
+    ]),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Return the schema version recorded in the database
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def rebuild_totals_rollup() -> int:
+    """
+    Recompute the currency totals rollup from the orders table
+
+    Returns:
+        Number of rollup rows written
+    """
+    with get_db_connection() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM order_totals_rollup")
+            row_count = conn.execute(ROLLUP_POPULATE_SQL).rowcount
+            conn.commit()
+            return row_count
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error rebuilding totals rollup: {str(e)}")
+            raise
+
+
+def dedupe_order_numbers() -> List[Tuple[str, str]]:
+    """
+    Rename duplicated order numbers so they can be made unique
+
+    The first copy of each number keeps it; later copies keep their data but
+    become <order_no>-dup-<rowid>.
+
+    Returns:
+        (old, new) order number of every renamed order
+    """
+    with get_db_connection() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            renamed = [
+                (row['order_no'], f"{row['order_no']}-dup-{row['rowid']}")
+                for row in conn.execute("""
+                    SELECT rowid, order_no
+                    FROM orders
+                    WHERE rowid NOT IN (SELECT MIN(rowid) FROM orders GROUP BY order_no)
+                    ORDER BY order_no, rowid
+                """).fetchall()
+            ]
+            conn.execute("""
+                UPDATE orders
+                SET order_no = order_no || '-dup-' || rowid
+                WHERE rowid NOT IN (SELECT MIN(rowid) FROM orders GROUP BY order_no)
+            """)
+            conn.commit()
+            return renamed
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error renaming duplicate order numbers: {str(e)}")
+            raise
+
+
+def rebuild_search_index():
+    """
+    Rebuild the full-text search index from the orders table
+    """
+    with get_db_connection() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(FTS_REBUILD_SQL)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error rebuilding search index: {str(e)}")
+            raise
+
+
+def apply_migrations(target_version: Optional[int] = None) -> int:
+    """
+    Apply pending migrations up to target_version (default: latest)
+
+    Each migration runs in its own IMMEDIATE transaction and re-checks the
+    version inside it, so concurrently starting workers apply it only once.
+
+    Returns:
+        The schema version after migrating
+    """
+    if target_version is None:
+        target_version = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+    with get_db_connection() as conn:
+        for version, description, statements in MIGRATIONS:
+            if version > target_version:
+                break
+
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                if get_schema_version(conn) >= version:
+                    conn.rollback()
+                    continue
+
+                logger.info(f"Applying migration {version}: {description}")
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(f"Migration {version} ({description}) failed: {str(e)}")
+                raise
+
+        conn.execute("PRAGMA optimize")
+        # New indexes and fresh statistics can change any captured plan
+        get_slow_query_log().clear()
+        return get_schema_version(conn)
@@ -1,5 +1,6 @@
 import sqlite3
-from typing import Dict
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from utils.shipping import get_tracking_url
 from .formatters import format_amount, format_record_dict
@@ -31,6 +32,130 @@ def format_order_dict(order: sqlite3.Row) -> Dict:
     return order_dict
 
 
+_UNSET = object()
+
+
+class OrderRecord(Mapping):
+    """
+    Read-only view of an orders row with the same keys as format_order_dict
+
+    None values read back as '' and the derived fields (amount_formatted,
+    amount_display, tracking_url) are only computed on first access, so
+    listing rows whose derived columns are never shown cost one small object
+    each. Works anywhere a dict is read: Jinja, dict(record) and jsonify.
+
+    Rows selected with build_formatted_select already carry the derived
+    columns, and are passed through as-is.
+    """
+    __slots__ = ('_row', '_keys', '_indexes', '_derived', '_amount', '_tracking_url')
+
+    def __init__(self, row: sqlite3.Row, keys: Optional[Tuple[str, ...]] = None,
+                 indexes: Optional[Tuple[int, ...]] = None, derived: Optional[bool] = None):
+        self._row = row
+        self._keys = keys if keys is not None else tuple(row.keys())
+        self._indexes = indexes if indexes is not None else tuple(range(len(self._keys)))
+        self._derived = derived if derived is not None else 'amount_display' not in self._keys
+        self._amount = None
+        self._tracking_url = _UNSET
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[sqlite3.Row], exclude: Iterable[str] = ()) -> List['OrderRecord']:
+        """
+        Wrap result rows, sharing one key tuple and hiding helper columns
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+
+        excluded = set(exclude)
+        columns = [(index, key) for index, key in enumerate(rows[0].keys()) if key not in excluded]
+        indexes = tuple(index for index, _ in columns)
+        keys = tuple(key for _, key in columns)
+        derived = 'amount_display' not in keys
+        return [cls(row, keys, indexes, derived) for row in rows]
+
+    def _amounts(self) -> Tuple[str, str]:
+        if self._amount is None:
+            amount = self._row['amount'] if 'amount' in self._keys else None
+            self._amount = format_amount(amount) if amount is not None and amount != '' else ('', '')
+        return self._amount
+
+    def _has_tracking(self) -> bool:
+        return ('shipper' in self._keys and 'tracking_no' in self._keys
+                and bool(self._row['shipper']) and bool(self._row['tracking_no']))
+
+    def __getitem__(self, key: str):
+        if key in self._keys:
+            value = self._row[key]
+            return '' if value is None else value
+        if key == 'amount_formatted':
+            return self._amounts()[0]
+        if key == 'amount_display':
+            return self._amounts()[1]
+        if key == 'tracking_url':
+            if self._tracking_url is _UNSET:
+                if not self._has_tracking():
+                    raise KeyError(key)
+                self._tracking_url = get_tracking_url(self._row['shipper'], self._row['tracking_no'])
+            return self._tracking_url
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        if not self._derived:
+            return key in self._keys
+        if key in ('amount_formatted', 'amount_display'):
+            return True
+        if key == 'tracking_url':
+            return self._has_tracking()
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._keys
+        if not self._derived:
+            return
+        yield 'amount_formatted'
+        yield 'amount_display'
+        if self._has_tracking():
+            yield 'tracking_url'
+
+    def __len__(self) -> int:
+        if not self._derived:
+            return len(self._keys)
+        return len(self._keys) + 2 + self._has_tracking()
+
+    def to_dict(self) -> Dict:
+        """
+        Materialize the record as a plain dict, equal to format_order_dict's output
+        """
+        values = tuple(self._row)
+        if not self._derived:
+            return {key: values[index] for key, index in zip(self._keys, self._indexes)}
+
+        order_dict = {
+            key: '' if values[index] is None else values[index]
+            for key, index in zip(self._keys, self._indexes)
+        }
+        order_dict['amount_formatted'], order_dict['amount_display'] = self._amounts()
+        if self._has_tracking():
+            order_dict['tracking_url'] = self['tracking_url']
+        return order_dict
+
+    def __repr__(self) -> str:
+        return f"OrderRecord({self.to_dict()!r})"
+
+
+def get_order_columns() -> list:
+    """
+    Get the orders table columns in schema order
+    """
+    return [
+        'order_date', 'vendor', 'order_no', 'item_name',
+        'quantity', 'currency', 'amount', 'color',
+        'shipped_date', 'shipper', 'tracking_no', 'location',
+        'delivery', 'last_updated', 'notes', 'order_status'
+    ]
+
+
 def get_order_not_null_columns() -> set:
     """
     Get the set of columns that should not be null for orders
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from config import ORDER_INDEX_REFRESH_MS, logger
+from utils.data_version import get_data_version, get_local_data_version
+from utils.database import get_pool, get_read_connection
+
+_LOAD_BATCH_SIZE = 10000
+
+
+class OrderNumberIndex:
+    """
+    In-process set of every order number, for answering "does it exist?"
+    without a query
+
+    The set is loaded once, then caught up whenever the data version changes
+    (every OrdersDB write bumps it, and commits from other processes change it
+    too) by reading only the rows whose rowid is above the highest one already
+    seen. Deletes are not tracked, so a number in the set may be gone and must
+    be confirmed in SQLite.
+
+    Hits are answered from memory alone. A miss re-checks the data version, one
+    PRAGMA, so a number committed by any process before the lookup is found.
+    A positive refresh_ms trades that for fewer PRAGMAs: a miss then only
+    re-checks when this process has written since the last refresh or
+    refresh_ms have passed, and a number committed by another process within
+    that window may be reported missing. That is safe for creates, which rely
+    on the UNIQUE order_no index rather than on this check.
+
+    New rows take rowids above the current maximum, so the high-water row is
+    checked on every catch-up: if it was deleted or replaced (e.g. the newest
+    orders were deleted, or a VACUUM renumbered rows), rowids may have been
+    reused below the mark and the set is reloaded from scratch.
+    """
+
+    def __init__(self, refresh_ms: float = ORDER_INDEX_REFRESH_MS):
+        self.refresh_interval = max(0.0, refresh_ms) / 1000
+        self._lock = threading.Lock()
+        self._numbers: Set[str] = set()
+        self._high_water: Optional[int] = None
+        self._high_water_no: Optional[str] = None
+        self._version: Optional[str] = None
+        self._database_path: Optional[str] = None
+        self._pid = os.getpid()
+        self._local_version: Optional[int] = None
+        self._checked_at = float('-inf')
+        self.loads = 0
+        self.catch_ups = 0
+
+    def refresh(self):
+        """
+        Bring the set up to date if the data may have changed since the last refresh
+        """
+        # Read before polling, so a write racing this refresh is seen by the next one
+        local_version = get_local_data_version()
+        version = get_data_version()
+        database_path = get_pool().database_path
+        if version == self._version and database_path == self._database_path and self._pid == os.getpid():
+            self._mark_checked(local_version)
+            return
+
+        with self._lock:
+            if version == self._version and database_path == self._database_path and self._pid == os.getpid():
+                self._mark_checked(local_version)
+                return
+            try:
+                with get_read_connection() as conn:
+                    if self._database_path != database_path or not self._high_water_unchanged(conn):
+                        self._load(conn)
+                    else:
+                        self._catch_up(conn)
+            except sqlite3.Error as e:
+                # A stale version is retried on the next check rather than trusted
+                logger.error(f"Error refreshing order number index: {str(e)}")
+                raise
+            self._version = version
+            self._database_path = database_path
+            self._pid = os.getpid()
+            self._mark_checked(local_version)
+
+    def _mark_checked(self, local_version: int):
+        self._local_version = local_version
+        self._checked_at = time.monotonic()
+
+    def _refresh_if_stale(self):
+        """
+        Refresh unless nothing can have changed: no write by this process, the
+        same database and process, and the last check is within refresh_ms
+        """
+        if get_local_data_version() != self._local_version \
+                or get_pool().database_path != self._database_path or self._pid != os.getpid() \
+                or time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.refresh()
+
+    def _high_water_unchanged(self, conn: sqlite3.Connection) -> bool:
+        if self._high_water is None:
+            return True
+        row = conn.execute("SELECT order_no FROM orders WHERE rowid = ?", (self._high_water,)).fetchone()
+        return row is not None and row['order_no'] == self._high_water_no
+
+    def _load(self, conn: sqlite3.Connection):
+        numbers = set()
+        high_water, high_water_no = None, None
+        cursor = conn.cursor()
+        # Plain tuples in large batches: building a Row per order dominates otherwise
+        cursor.row_factory = None
+        # Unordered so SQLite can read the narrow order_no index instead of the table
+        cursor.execute("SELECT rowid, order_no FROM orders")
+        while True:
+            rows = cursor.fetchmany(_LOAD_BATCH_SIZE)
+            if not rows:
+                break
+            numbers.update(order_no for _, order_no in rows)
+            batch_high = max(rows)
+            if high_water is None or batch_high[0] > high_water:
+                high_water, high_water_no = batch_high
+        self._numbers = numbers
+        self._high_water, self._high_water_no = high_water, high_water_no
+        self.loads += 1
+
+    def _catch_up(self, conn: sqlite3.Connection):
+        rows = conn.execute("SELECT rowid, order_no FROM orders WHERE rowid > ? ORDER BY rowid",
+                            (self._high_water if self._high_water is not None else 0,)).fetchall()
+        if rows:
+            self._numbers.update(row['order_no'] for row in rows)
+            self._high_water, self._high_water_no = rows[-1][0], rows[-1][1]
+        self.catch_ups += 1
+
+    def might_contain(self, order_no: str) -> bool:
+        """
+        Return False if order_no certainly does not exist
+        """
+        # A number already in the set is confirmed in SQLite anyway; only a
+        # miss needs the set to be current
+        if order_no in self._numbers:
+            return True
+        self._refresh_if_stale()
+        return order_no in self._numbers
+
+    def candidates(self, order_nos: Iterable[str]) -> List[str]:
+        """
+        Return the order numbers that might exist, dropping the ones that certainly do not
+        """
+        order_nos = list(order_nos)
+        if not all(order_no in self._numbers for order_no in order_nos):
+            self._refresh_if_stale()
+        numbers = self._numbers
+        return [order_no for order_no in order_nos if order_no in numbers]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the index size and how often it was loaded or caught up
+        """
+        return {'order_numbers': len(self._numbers), 'loads': self.loads, 'catch_ups': self.catch_ups}
+
+
+_order_index = OrderNumberIndex()
+
+
+def get_order_index() -> OrderNumberIndex:
+    """
+    Return the process-wide order number index
+    """
+    return _order_index
@@ -1,3 +1,9 @@
+import base64
+import binascii
+import json
+from typing import Optional, Tuple
+
+
 def validate_page_number(page_str, default=1):
     """
     Validate and return page number
@@ -9,10 +15,75 @@ def validate_page_number(page_str, default=1):
         return default
 
 
-def create_pagination_info(current_page, total_count, limit):
+def validate_limit(limit_str, default=50, maximum=200):
+    """
+    Validate and return a page size, capped at maximum
+    """
+    try:
+        limit = int(limit_str) if limit_str else default
+        return min(limit, maximum) if limit >= 1 else default
+    except ValueError:
+        return default
+
+
+def encode_cursor(order_date, last_updated, rowid) -> str:
+    """
+    Encode a row's sort key as an opaque, URL-safe cursor token
+    """
+    payload = json.dumps([order_date, last_updated, rowid], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[str, str, int]]:
+    """
+    Decode a cursor token back into (order_date, last_updated, rowid)
+    Returns None for a missing or malformed token
+    """
+    if not token:
+        return None
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+
+    if not isinstance(values, list) or len(values) != 3:
+        return None
+
+    order_date, last_updated, rowid = values
+    if not isinstance(order_date, str) or not isinstance(last_updated, str) or not isinstance(rowid, int):
+        return None
+
+    return order_date, last_updated, rowid
+
+
+def cursor_from_row(row) -> str:
+    """
+    Build a cursor token from a row selected with order_date, last_updated and order_rowid
+    """
+    return encode_cursor(row['order_date'], row['last_updated'], row['order_rowid'])
+
+
+def create_pagination_info(current_page, total_count, limit,
+                           next_cursor=None, prev_cursor=None, cursor_mode=False):
     """
     Create pagination information dictionary
+
+    In cursor mode the client navigates with next_cursor/prev_cursor, so
+    has_next/has_prev follow the cursors, and current_page/total_pages are
+    left out since a cursor page has no page number.
     """
+    if cursor_mode:
+        return {
+            'total_count': total_count,
+            'has_prev': prev_cursor is not None,
+            'has_next': next_cursor is not None,
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
+        }
+
     total_pages = (total_count + limit - 1) // limit
     return {
         'current_page': current_page,
@@ -20,5 +91,32 @@ def create_pagination_info(current_page, total_count, limit):
         'total_count': total_count,
         'has_prev': current_page > 1,
         'has_next': current_page < total_pages,
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor
+    }
+
+
+def create_cursor_pagination_info(limit, next_cursor=None, prev_cursor=None):
+    """
+    Create pagination information for cursor-only listings without a total count
+    """
+    return {
+        'limit': limit,
+        'has_next': next_cursor is not None,
+        'has_prev': prev_cursor is not None,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor
+    }
+
+
+def create_page_pagination_info(current_page, limit, has_next):
+    """
+    Create pagination information for paged listings without a total count
+    """
+    return {
+        'current_page': current_page,
+        'has_prev': current_page > 1,
+        'has_next': has_next,
         'limit': limit
     }
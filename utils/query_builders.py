@@ -1,4 +1,29 @@
-from typing import Optional, Tuple, List
+import re
+from typing import Iterable, Optional, Tuple, List
+
+
+def get_date_range(year_filter: Optional[str] = None,
+                   month_filter: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """
+    Convert a year (and optional month) filter into a half-open ISO date range
+
+    Returns:
+        Tuple of (start, end) such that start <= date < end, or None if the
+        filters cannot be expressed as a range
+    """
+    if not year_filter or len(year_filter) != 4 or not year_filter.isdigit():
+        return None
+
+    year = int(year_filter)
+    if not month_filter:
+        return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+
+    if len(month_filter) != 2 or not month_filter.isdigit() or not 1 <= int(month_filter) <= 12:
+        return None
+
+    month = int(month_filter)
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
 
 
 def build_date_filter_conditions(year_filter: Optional[str] = None,
@@ -7,6 +32,10 @@ def build_date_filter_conditions(year_filter: Optional[str] = None,
     """
     Build date-based query filter conditions
 
+    Year and year/month filters compare the bare column against a half-open
+    date range so an index on date_field can be used. A month without a year
+    spans every year and falls back to strftime.
+
     Args:
         year_filter: Year to filter by (YYYY format)
         month_filter: Month to filter by (MM format)
@@ -18,6 +47,12 @@ def build_date_filter_conditions(year_filter: Optional[str] = None,
     query_conditions = ""
     query_params = []
 
+    date_range = get_date_range(year_filter, month_filter)
+    if date_range:
+        query_conditions += f" AND {date_field} >= ? AND {date_field} < ?"
+        query_params.extend(date_range)
+        return query_conditions, query_params
+
     if year_filter:
         query_conditions += f" AND strftime('%Y', {date_field}) = ?"
         query_params.append(year_filter)
@@ -29,6 +64,28 @@ def build_date_filter_conditions(year_filter: Optional[str] = None,
     return query_conditions, query_params
 
 
+def build_period_filter_conditions(year_filter: Optional[str] = None,
+                                   month_filter: Optional[str] = None,
+                                   year_field: str = 'year',
+                                   month_field: str = 'month') -> Tuple[str, List]:
+    """
+    Build filter conditions against pre-split year/month columns, as stored in
+    the totals rollup
+    """
+    query_conditions = ""
+    query_params = []
+
+    if year_filter:
+        query_conditions += f" AND {year_field} = ?"
+        query_params.append(year_filter)
+
+    if month_filter:
+        query_conditions += f" AND {month_field} = ?"
+        query_params.append(month_filter)
+
+    return query_conditions, query_params
+
+
 def build_status_filter_conditions(status_filter: Optional[str] = None,
                                    status_field: str = 'order_status') -> Tuple[str, List]:
     """
@@ -57,3 +114,108 @@ def combine_filter_conditions(*conditions: Tuple[str, List]) -> Tuple[str, List]
             all_params.extend(params)
 
     return ''.join(all_conditions), all_params
+
+
+def build_seek_conditions(cursor: Optional[Tuple[str, str, int]] = None,
+                          backwards: bool = False,
+                          sort_fields: Tuple[str, ...] = ('order_date', 'last_updated', 'rowid')
+                          ) -> Tuple[str, List]:
+    """
+    Build a keyset (seek) condition for rows sorted descending by sort_fields
+
+    Args:
+        cursor: Decoded cursor values matching sort_fields
+        backwards: Seek to rows before the cursor instead of after it
+        sort_fields: Columns making up the sort key, most significant first
+
+    Returns:
+        Tuple of (query_conditions, query_params)
+    """
+    if not cursor:
+        return "", []
+
+    operator = '>' if backwards else '<'
+    fields = ', '.join(sort_fields)
+    placeholders = ', '.join('?' for _ in sort_fields)
+    return f" AND ({fields}) {operator} ({placeholders})", list(cursor)
+
+
+def build_search_match(search_query: Optional[str]) -> Optional[str]:
+    """
+    Turn free-text user input into a safe FTS5 MATCH expression
+
+    Each whitespace-separated term becomes a quoted phrase of its word
+    characters with prefix matching on the last word, so "PO-0012" matches
+    PO-001234 and FTS5 operators in the input are never interpreted.
+    Terms are ANDed together.
+
+    Returns:
+        The MATCH expression, or None if the input has no searchable words
+    """
+    if not search_query:
+        return None
+
+    phrases = []
+    for term in search_query.split():
+        words = re.findall(r"\w+", term)
+        if words:
+            phrases.append(f'"{" ".join(words)}"*')
+
+    return ' '.join(phrases) or None
+
+
+def build_formatted_select(columns: List[str], table_alias: str = '',
+                           not_null_columns: Iterable[str] = ()) -> str:
+    """
+    Build a select list that returns orders columns ready for display
+
+    NULLs come back as '', and amount_formatted, amount_display and
+    tracking_url are computed by SQLite with the same rules as
+    format_order_dict, so listing rows need no per-row Python formatting.
+    tracking_url is always present and is '' when the order has no link.
+
+    Args:
+        columns: Orders columns to select, in output order
+        table_alias: Alias of the orders table, if the query joins it
+        not_null_columns: Columns selected bare; this also keeps ORDER BY on
+            them resolving to the indexed column rather than an expression
+    """
+    prefix = f"{table_alias}." if table_alias else ''
+    # Always qualified, or the carrier subquery would bind them to its own table
+    qualifier = f"{table_alias or 'orders'}."
+    amount = f"{prefix}amount"
+    shipper = f"{qualifier}shipper"
+    tracking_no = f"{qualifier}tracking_no"
+
+    # Mirrors format_amount: blank stays blank, numbers get two decimals (and
+    # thousands separators for display), anything else is shown verbatim.
+    # Working in whole cents keeps it to one float conversion per expression;
+    # SQLite's printf only groups thousands for integers.
+    cents = f"CAST(round(CAST({amount} AS REAL) * 100) AS INTEGER)"
+    sign = f"CASE WHEN {cents} < 0 THEN '-' ELSE '' END"
+    fixed = f"printf('%s%d.%02d', {sign}, abs({cents}) / 100, abs({cents}) % 100)"
+    grouped = f"printf('%s%,d.%02d', {sign}, abs({cents}) / 100, abs({cents}) % 100)"
+    is_blank = f"{amount} IS NULL OR {amount} = ''"
+    is_numeric = f"{amount} GLOB '*[0-9]*' AND {amount} NOT GLOB '*[^0-9.+-]*'"
+
+    tracking_url = f"""CASE
+                WHEN COALESCE({shipper}, '') = '' OR COALESCE({tracking_no}, '') = '' THEN ''
+                ELSE COALESCE((SELECT url_prefix
+                                   || CASE WHEN {tracking_no} GLOB '*[^A-Za-z0-9_.~/-]*'
+                                           THEN url_quote({tracking_no}) ELSE {tracking_no} END
+                                   || url_suffix
+                               FROM temp.shipping_carriers
+                               WHERE shipping_carriers.shipper = upper({shipper})), '')
+            END"""
+
+    not_null_columns = set(not_null_columns)
+    select_list = [
+        f"{prefix}{column}" if column in not_null_columns else f"COALESCE({prefix}{column}, '') AS {column}"
+        for column in columns
+    ]
+    select_list.append(f"""CASE WHEN {is_blank} THEN '' WHEN {is_numeric} THEN {fixed}
+                ELSE {amount} END AS amount_formatted""")
+    select_list.append(f"""CASE WHEN {is_blank} THEN '' WHEN {is_numeric} THEN {grouped}
+                ELSE {amount} END AS amount_display""")
+    select_list.append(f"{tracking_url} AS tracking_url")
+    return ',\n                '.join(select_list)
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+from config import QUERY_REGISTRY_MAX_SIZE
+
+
+class QueryRegistry:
+    """
+    Thread-safe registry of compiled SQL, keyed by query name and filter shape
+
+    A shape is whatever decides the text of a query but not its parameter
+    values, e.g. which filters are present. Every request with the same shape
+    gets the identical SQL string back, so the text is only assembled once per
+    process and each pooled connection's statement cache can reuse the prepared
+    statement instead of parsing it again.
+
+    Shapes that clients control (e.g. a sparse fieldset) could otherwise grow
+    the registry without limit, so it holds at most max_size queries and
+    evicts the least recently used one beyond that.
+    """
+
+    def __init__(self, max_size: int = QUERY_REGISTRY_MAX_SIZE):
+        self.max_size = max(1, int(max_size))
+        self._lock = threading.Lock()
+        self._queries: 'OrderedDict[Tuple[str, Hashable], str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name: str, shape: Hashable, compile_query: Callable[[], str]) -> str:
+        """
+        Return the SQL for name at shape, compiling it on first use
+        """
+        key = (name, shape)
+        with self._lock:
+            sql = self._queries.get(key)
+            if sql is not None:
+                self._queries.move_to_end(key)
+                self.hits += 1
+                return sql
+            self.misses += 1
+
+        sql = compile_query()
+        with self._lock:
+            # Another thread may have compiled it meanwhile; keep the first copy
+            sql = self._queries.setdefault(key, sql)
+            while len(self._queries) > self.max_size:
+                self._queries.popitem(last=False)
+                self.evictions += 1
+            return sql
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return a snapshot of registry usage
+        """
+        with self._lock:
+            return {'queries': len(self._queries), 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
+
+    def clear(self):
+        """
+        Drop all compiled queries and reset the counters
+        """
+        with self._lock:
+            self._queries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_registry = QueryRegistry()
+
+
+def get_query_registry() -> QueryRegistry:
+    """
+    Return the process-wide query registry
+    """
+    return _registry
+
+
+def compiled_query(name: str, shape: Hashable, compile_query: Callable[[], str]) -> str:
+    """
+    Fetch SQL from the process-wide registry, compiling it on first use
+    """
+    return _registry.get(name, shape, compile_query)
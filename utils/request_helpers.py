@@ -24,3 +24,21 @@ def validate_required_fields(data, required_fields):
     Return list of missing required fields
     """
     return [field for field in required_fields if not data.get(field)]
+
+
+def extract_fields(request, allowed_fields):
+    """
+    Return the columns named by the fields parameter, in allowed_fields order
+
+    All allowed fields are returned when the parameter is absent or empty.
+    Raises ValueError naming any unknown field.
+    """
+    requested = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    if not requested:
+        return list(allowed_fields)
+
+    unknown = [field for field in requested if field not in allowed_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return [field for field in allowed_fields if field in requested]
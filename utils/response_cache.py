@@ -0,0 +1,151 @@
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from flask import Response, make_response, request, session
+
+from config import RESPONSE_CACHE_MAX_BYTES
+from utils.data_version import get_data_version
+
+# Rough per-entry cost of the key, headers and bookkeeping beyond the body itself
+_ENTRY_OVERHEAD = 512
+
+
+class CachedResponse(NamedTuple):
+    version: str
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    size: int
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of rendered responses, bounded by memory
+
+    Entries are only served for the data version they were rendered under, so
+    any write through OrdersDB (which bumps the version) makes every entry
+    stale; stale entries are dropped as they are found. The least recently used
+    entries are evicted once the cached bodies exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, CachedResponse]' = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: str) -> Optional[CachedResponse]:
+        """
+        Return the entry for key if it was rendered at version
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, entry: CachedResponse):
+        """
+        Store entry, evicting least recently used entries to stay within max_bytes
+        """
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        self.bytes -= self._entries.pop(key).size
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return a snapshot of cache usage
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+    def clear(self):
+        """
+        Drop all cached responses
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+_response_cache = ResponseCache()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the process-wide response cache
+    """
+    return _response_cache
+
+
+def request_cache_key() -> Hashable:
+    """
+    Identify the response a GET request asks for
+
+    Every query argument (filters, page, cursors, limit) shapes the body, and
+    AJAX requests get JSON instead of a full page.
+    """
+    return (request.endpoint, tuple(sorted(request.args.items(multi=True))),
+            request.headers.get('X-Requested-With') == 'XMLHttpRequest')
+
+
+def vary_on_request_key(response: Response) -> Response:
+    """
+    Declare the request headers that request_cache_key() depends on, so
+    browsers and proxies never serve the AJAX body for a full page or vice versa
+    """
+    response.vary.add('X-Requested-With')
+    return response
+
+
+def cache_response(view: Callable) -> Callable:
+    """
+    Serve a GET view from the response cache while the data is unchanged
+
+    Only complete 200 responses that leave the session untouched are stored.
+    Requests with pending flash messages bypass the cache, since the page
+    would show them.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = _response_cache
+        if cache.max_bytes == 0 or request.method != 'GET' or '_flashes' in session:
+            return vary_on_request_key(make_response(view(*args, **kwargs)))
+
+        key = (request_cache_key(), tuple(sorted(kwargs.items())))
+        version = get_data_version()
+        entry = cache.get(key, version)
+        if entry is not None:
+            return Response(entry.body, status=entry.status, headers=entry.headers)
+
+        response = vary_on_request_key(make_response(view(*args, **kwargs)))
+        if response.status_code == 200 and not response.is_streamed and not session.modified \
+                and 'Set-Cookie' not in response.headers:
+            body = response.get_data()
+            headers = list(response.headers.items())
+            size = len(body) + sum(len(name) + len(value) for name, value in headers) + _ENTRY_OVERHEAD
+            cache.put(key, CachedResponse(version, response.status_code, headers, body, size))
+        return response
+
+    return wrapper
@@ -72,3 +72,10 @@ def get_required_order_fields() -> list:
     Get required fields for order creation
     """
     return ['vendor', 'order_no', 'item_name', 'amount']
+
+
+def get_bulk_update_fields() -> list:
+    """
+    Get the fields that can be changed on many orders at once
+    """
+    return ['order_status', 'shipped_date', 'shipper', 'tracking_no', 'location']
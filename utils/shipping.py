@@ -1,7 +1,11 @@
+import sqlite3
 from typing import Optional
 from urllib.parse import quote
 from config import SHIPPING_CARRIERS
 
+# Shippers are stored upper-cased, so look carriers up the same way
+_CARRIER_URLS = {shipper.upper(): template for shipper, template in SHIPPING_CARRIERS.items()}
+
 
 def get_tracking_url(shipper: str, tracking_no: str) -> Optional[str]:
     """Generate tracking URL for a given shipper and tracking number.
@@ -17,8 +21,36 @@ def get_tracking_url(shipper: str, tracking_no: str) -> Optional[str]:
         return None
 
     shipper = shipper.upper()
-    if shipper not in SHIPPING_CARRIERS:
+    if shipper not in _CARRIER_URLS:
         return None
 
     encoded_tracking = quote(str(tracking_no))
-    return SHIPPING_CARRIERS[shipper].format(encoded_tracking)
\ No newline at end of file
+    return _CARRIER_URLS[shipper].format(encoded_tracking)
+
+
+def install_carrier_lookup(conn: sqlite3.Connection) -> None:
+    """Create a per-connection carrier table for building tracking URLs in SQL.
+
+    Each SHIPPING_CARRIERS template is split around its "{}" placeholder into
+    temp.shipping_carriers(shipper, url_prefix, url_suffix), keyed by the
+    upper-cased carrier name, and url_quote()
+    is registered for tracking numbers that need percent-encoding.
+
+    Args:
+        conn: The connection to install the lookup on
+    """
+    conn.create_function("url_quote", 1, lambda value: quote(str(value)), deterministic=True)
+    conn.execute("""
+                 CREATE TEMP TABLE IF NOT EXISTS shipping_carriers
+                 (
+                     shipper    TEXT PRIMARY KEY,
+                     url_prefix TEXT NOT NULL,
+                     url_suffix TEXT NOT NULL
+                 ) WITHOUT ROWID
+                 """)
+    conn.execute("DELETE FROM temp.shipping_carriers")
+    conn.executemany(
+        "INSERT INTO temp.shipping_carriers (shipper, url_prefix, url_suffix) VALUES (?, ?, ?)",
+        [(shipper, *template.split("{}", 1)) for shipper, template in _CARRIER_URLS.items()]
+    )
+    conn.commit()
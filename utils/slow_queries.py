@@ -0,0 +1,136 @@
+import random
+import re
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import List
+
+from config import SLOW_QUERY_MS, SLOW_QUERY_SAMPLE_RATE, slow_query_logger
+
+# A column wrapped in a function, e.g. strftime('%m', order_date) = ?, cannot seek an index
+_FUNCTION_PREDICATE = re.compile(r"\b(?:strftime|date|datetime|substr|lower|upper|trim|CAST)\s*\([^()]*\)\s*(?:=|<|>|!=|IN\b|LIKE\b)",
+                                 re.IGNORECASE)
+
+# Plans only change after migrations or ANALYZE, so each statement is explained once
+_PLAN_CACHE_SIZE = 256
+
+
+class SlowQueryLog:
+    """
+    Logs statements that run past a threshold, with their EXPLAIN QUERY PLAN
+
+    Checking a statement is a single comparison; only statements already over
+    the threshold are sampled, and the plan for a given SQL text is captured
+    once and reused. Parameter values are never logged, only their types.
+    Plans that scan a whole table or sort in a temp b-tree, and predicates that
+    wrap a column in a function, are called out.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, sample_rate: float = SLOW_QUERY_SAMPLE_RATE):
+        self._lock = threading.Lock()
+        self._plans: 'OrderedDict[str, List[str]]' = OrderedDict()
+        self.configure(threshold_ms, sample_rate)
+
+    def configure(self, threshold_ms: float, sample_rate: float):
+        """
+        Change the threshold (0 disables logging) and the fraction of slow statements logged
+        """
+        self.threshold = threshold_ms / 1000 if threshold_ms > 0 else float('inf')
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+
+    def _explain(self, conn: sqlite3.Connection, sql: str, parameters) -> List[str]:
+        with self._lock:
+            plan = self._plans.get(sql)
+            if plan is not None:
+                self._plans.move_to_end(sql)
+                return plan
+
+        try:
+            # Run on the base class so the plan itself is not instrumented
+            rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+            plan = [row[3] for row in rows]
+        except sqlite3.Error as e:
+            plan = [f"(plan unavailable: {str(e)})"]
+
+        with self._lock:
+            self._plans[sql] = plan
+            if len(self._plans) > _PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+    def record(self, conn: sqlite3.Connection, sql: str, parameters, elapsed: float, many: bool = False):
+        """
+        Log the statement if it took at least the threshold and is sampled
+        """
+        if elapsed < self.threshold or random.random() >= self.sample_rate:
+            return
+
+        plan = [] if many else self._explain(conn, sql, parameters)
+        flags = [f"FULL SCAN: {step}" for step in plan if _is_full_scan(step)]
+        flags += [f"TEMP SORT: {step}" for step in plan if step.startswith('USE TEMP B-TREE')]
+        flags += [f"FUNCTION ON COLUMN: {match}" for match in _FUNCTION_PREDICATE.findall(sql)]
+        slow_query_logger.warning(
+            "Slow query %.1f ms from %s, params %s%s\n%s\n%s",
+            elapsed * 1000,
+            _caller(),
+            'executemany' if many else _parameter_shape(parameters),
+            ''.join(f"; {flag}" for flag in dict.fromkeys(flags)),
+            ' '.join(sql.split()),
+            '\n'.join(f"  {step}" for step in plan)
+        )
+
+    def clear(self):
+        """
+        Forget captured plans, e.g. after a migration
+        """
+        with self._lock:
+            self._plans.clear()
+
+
+def _is_full_scan(step: str) -> bool:
+    # "SCAN orders" reads every row; "SCAN orders USING INDEX ..." walks an index in order
+    # and "SCAN (subquery-N)" reads an already computed subquery
+    return (step.startswith('SCAN ') and not step.startswith('SCAN (')
+            and ' USING ' not in step and 'VIRTUAL TABLE' not in step)
+
+
+def _parameter_shape(parameters) -> str:
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in parameters or ()) + ')'
+
+
+def _caller() -> str:
+    # First frame outside the database plumbing, e.g. models/orders.py:123 in search
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = _short_path(frame.f_code.co_filename)
+        if filename not in ('utils/database.py', 'utils/slow_queries.py'):
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+def _short_path(filename: str) -> str:
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+
+_slow_query_log = SlowQueryLog()
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    """
+    Return the process-wide slow query log
+    """
+    return _slow_query_log
+
+
+def record_statement(conn: sqlite3.Connection, sql: str, parameters, elapsed: float, many: bool = False):
+    """
+    Hand a statement whose time so far has reached the threshold to the
+    process-wide slow query log
+    """
+    if elapsed >= _slow_query_log.threshold:
+        _slow_query_log.record(conn, sql, parameters, elapsed, many)
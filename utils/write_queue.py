@@ -0,0 +1,231 @@
+import atexit
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from queue import Empty, Queue
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from config import WRITE_BATCH_SIZE, WRITE_BATCH_WAIT_MS, logger
+from utils.data_version import bump_data_version
+from utils.database import get_pool, get_writer
+
+T = TypeVar('T')
+WriteOperation = Callable[[sqlite3.Cursor], T]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Single writer thread that commits queued write operations in batches
+
+    Callers submit an operation (a function taking a cursor) and wait on the
+    returned Future. The writer takes every operation already queued, up to
+    batch_size, optionally waiting up to max_wait_ms for more to arrive, and
+    runs the whole batch in one IMMEDIATE transaction at synchronous=FULL.
+    Each operation runs inside its own savepoint, so a failing one is rolled
+    back and reported without affecting the rest. Futures are resolved only
+    after the batch's COMMIT has returned, so an acknowledged write is
+    durable, and one fsync covers the whole batch. While a batch is committing
+    the next one accumulates, so batches grow with load even without a wait.
+
+    Batches run on the process's single writer connection (get_writer()),
+    checked out per batch, so queued writes share its instrumentation and
+    still serialize with bulk writes and migrations instead of contending for
+    SQLite's lock from a second connection. Each operation runs in its
+    submitter's context, so its SQL counts toward that request's metrics.
+    """
+
+    def __init__(self, database_path: str, batch_size: int = WRITE_BATCH_SIZE,
+                 max_wait_ms: float = WRITE_BATCH_WAIT_MS):
+        self.database_path = database_path
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._lock = threading.Lock()
+        self._queue: Queue = Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._closed = False
+        self.batches = 0
+        self.operations = 0
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's writer thread does not exist here
+                self._queue = Queue()
+                self._thread = None
+                self._pid = os.getpid()
+            if self._closed:
+                raise sqlite3.OperationalError("Write queue has been closed")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='order-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, operation: WriteOperation) -> 'Future[T]':
+        """
+        Queue operation for the next batch and return a Future for its result
+        """
+        self._ensure_writer()
+        future: Future = Future()
+        self._queue.put((future, operation, contextvars.copy_context()))
+        return future
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stop = self._collect(item)
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Whatever went wrong, no caller may be left waiting and the writer keeps running
+                logger.error(f"Write queue batch of {len(batch)} failed: {str(e)}", exc_info=True)
+                _fail_futures([future for future, _, _ in batch], e)
+
+    def _commit(self, batch: List[Tuple[Future, WriteOperation, contextvars.Context]]):
+        writer = get_writer()
+        conn = writer.acquire()
+        try:
+            outcomes = self._run_batch(conn, batch)
+        finally:
+            writer.release(conn)
+
+        with self._lock:
+            self.batches += 1
+            self.operations += len(outcomes)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    @staticmethod
+    def _run_batch(conn: sqlite3.Connection,
+                   batch: List[Tuple[Future, WriteOperation, contextvars.Context]]) -> List:
+        started = []
+        outcomes = []
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        try:
+            conn.execute("PRAGMA synchronous = FULL")
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            for future, operation, context in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                started.append(future)
+                conn.execute("SAVEPOINT write_operation")
+                try:
+                    result = context.run(operation, cursor)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_operation")
+                    conn.execute("RELEASE write_operation")
+                    outcomes.append((future, None, e))
+                else:
+                    conn.execute("RELEASE write_operation")
+                    outcomes.append((future, result, None))
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Error committing write batch of {len(batch)}: {str(e)}")
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error as rollback_error:
+                logger.error(f"Error rolling back write batch: {str(rollback_error)}")
+            # Nothing in the batch was committed; every started or pending caller sees the failure
+            outcomes = [(future, None, e) for future in started]
+            for future, _, _ in batch:
+                if future not in started and future.set_running_or_notify_cancel():
+                    outcomes.append((future, None, e))
+        finally:
+            bump_data_version()
+            try:
+                conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+            except sqlite3.Error as e:
+                logger.error(f"Error restoring writer synchronous mode: {str(e)}")
+        return outcomes
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return batch and operation counters
+        """
+        with self._lock:
+            return {'batches': self.batches, 'operations': self.operations, 'pending': self._queue.qsize()}
+
+    def close(self, timeout: Optional[float] = 10):
+        """
+        Commit everything already queued, then stop the writer thread
+        """
+        with self._lock:
+            if self._closed or self._pid != os.getpid():
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+
+_write_queue: Optional[WriteQueue] = None
+_write_queue_lock = threading.Lock()
+
+
+def _fail_futures(futures: List[Future], error: Exception):
+    """
+    Fail every future that has not been resolved yet
+    """
+    for future in futures:
+        if future.done():
+            continue
+        if future.running() or future.set_running_or_notify_cancel():
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+
+def get_write_queue() -> WriteQueue:
+    """
+    Return the process-wide write queue for the pool's database, creating it on first use
+    """
+    global _write_queue
+    database_path = get_pool().database_path
+    with _write_queue_lock:
+        if _write_queue is None or _write_queue.database_path != database_path:
+            if _write_queue is not None:
+                _write_queue.close()
+            _write_queue = WriteQueue(database_path)
+        return _write_queue
+
+
+def close_write_queue():
+    """
+    Flush and stop the process-wide write queue
+    """
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.close()
+            _write_queue = None
+
+
+atexit.register(close_write_queue)